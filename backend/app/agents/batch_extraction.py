@@ -0,0 +1,428 @@
+"""Deferred place extraction through the OpenAI Batch and Anthropic Message Batches APIs.
+
+Batch jobs cost roughly half as much per token as synchronous calls and don't count
+against interactive rate limits. In exchange, results can arrive any time within a
+24h window, so this suits bulk ingests where the user comes back for the results
+later.
+
+TRADEOFF: Pending jobs are tracked in process memory (like sessions), so a restart
+loses track of in-flight batches.
+"""
+
+import asyncio
+from collections import defaultdict
+from collections.abc import Iterable, Iterator
+from functools import lru_cache
+
+import orjson
+from anthropic import AsyncAnthropic
+from openai import AsyncOpenAI
+from pydantic import BaseModel, ValidationError
+
+from app.agents.extraction import (
+    EXTRACTION_SYSTEM_PROMPT,
+    LLMExtractionResult,
+    PlaceExtractionResult,
+    _build_messages,
+    _cache_variant,
+    _chunk_transcript,
+    _merge_extraction_results,
+    _to_place_extraction_result,
+)
+from app.config import settings
+from app.models.video import Video
+from app.services import extraction_cache
+from app.services.http_client import get_http_client, on_http_client_closed
+from app.services.llm_client import (
+    CLAUDE_MODEL_NAME,
+    OPENAI_MODEL_NAME,
+    LLMProvider,
+    json_schema_response_format,
+)
+from app.utils.cache import TTLCache
+from app.utils.errors import ExtractionError, InvalidBatchError, LLMProviderError
+from app.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+BATCH_COMPLETION_WINDOW = "24h"
+
+# Anthropic batch requests need an explicit output budget
+ANTHROPIC_BATCH_MAX_TOKENS = 8192
+
+# Batch statuses (normalized across providers) after which no results will be produced
+BATCH_FAILED_STATUSES = frozenset({"failed", "expired", "cancelled"})
+
+# Pending jobs are kept a little past the completion window so late polls resolve
+_JOB_TTL_SECONDS = 25 * 3600
+
+
+class ExtractionBatchJob(BaseModel):
+    """A submitted extraction batch and the videos awaiting its results."""
+
+    batch_id: str
+    session_id: str
+    provider: LLMProvider = "openai"
+    videos: list[Video]
+
+
+_jobs: TTLCache[str, ExtractionBatchJob] = TTLCache(maxsize=1024, ttl_seconds=_JOB_TTL_SECONDS)
+
+
+@lru_cache(maxsize=1)
+def _get_openai_client() -> AsyncOpenAI:
+    """
+    Create the OpenAI client used for batch jobs (once per process).
+
+    Raises:
+        LLMProviderError: If the OpenAI API key is missing
+    """
+    if not settings.openai_api_key:
+        raise LLMProviderError("OpenAI API key not configured")
+    return AsyncOpenAI(api_key=settings.openai_api_key, http_client=get_http_client())
+
+
+@lru_cache(maxsize=1)
+def _get_anthropic_client() -> AsyncAnthropic:
+    """
+    Create the Anthropic client used for batch jobs (once per process).
+
+    Raises:
+        LLMProviderError: If the Anthropic API key is missing
+    """
+    if not settings.anthropic_api_key:
+        raise LLMProviderError("Anthropic API key not configured")
+    return AsyncAnthropic(api_key=settings.anthropic_api_key, http_client=get_http_client())
+
+
+# The batch clients hold the shared HTTP client, so rebuild them once it's closed
+on_http_client_closed(_get_openai_client.cache_clear)
+on_http_client_closed(_get_anthropic_client.cache_clear)
+
+
+def _model_name(provider: LLMProvider) -> str:
+    """Get the model batch extraction uses for a provider."""
+    return OPENAI_MODEL_NAME if provider == "openai" else CLAUDE_MODEL_NAME
+
+
+def _chunk_requests(videos: list[Video]) -> Iterator[tuple[str, Video, str]]:
+    """
+    Yield (custom ID, video, transcript chunk) for every extraction request.
+
+    Custom IDs have the form ``{video_id}-{chunk_index}``, which fits both
+    providers' ID rules (Anthropic only allows letters, digits, ``_`` and ``-``).
+    """
+    for video in videos:
+        for idx, chunk in enumerate(_chunk_transcript(video.transcript)):
+            yield f"{video.video_id}-{idx}", video, chunk
+
+
+def build_batch_input(videos: list[Video]) -> bytes:
+    """
+    Serialize extraction requests for videos as OpenAI Batch API JSONL.
+
+    Long transcripts produce one request per chunk.
+
+    Args:
+        videos: Videos with transcripts to extract
+
+    Returns:
+        JSONL file contents
+    """
+    response_format = json_schema_response_format(LLMExtractionResult)
+    return b"\n".join(
+        orjson.dumps(
+            {
+                "custom_id": custom_id,
+                "method": "POST",
+                "url": BATCH_ENDPOINT,
+                "body": {
+                    "model": OPENAI_MODEL_NAME,
+                    "messages": _build_messages(video, chunk),
+                    "response_format": response_format,
+                },
+            }
+        )
+        for custom_id, video, chunk in _chunk_requests(videos)
+    )
+
+
+def build_anthropic_batch_requests(videos: list[Video]) -> list[dict]:
+    """
+    Build Message Batches API requests for videos.
+
+    Structured output is requested by forcing a single tool call whose input
+    schema is the extraction schema. The system prompt is marked for prompt
+    caching, as in synchronous calls.
+
+    Args:
+        videos: Videos with transcripts to extract
+
+    Returns:
+        Batch request dictionaries, one per transcript chunk
+    """
+    tool = {
+        "name": LLMExtractionResult.__name__,
+        "description": LLMExtractionResult.__doc__,
+        "input_schema": LLMExtractionResult.model_json_schema(),
+    }
+    system = [
+        {"type": "text", "text": EXTRACTION_SYSTEM_PROMPT, "cache_control": {"type": "ephemeral"}}
+    ]
+    return [
+        {
+            "custom_id": custom_id,
+            "params": {
+                "model": CLAUDE_MODEL_NAME,
+                "max_tokens": ANTHROPIC_BATCH_MAX_TOKENS,
+                "temperature": 0.1,
+                "system": system,
+                # The system message is passed separately above
+                "messages": _build_messages(video, chunk)[1:],
+                "tools": [tool],
+                "tool_choice": {"type": "tool", "name": tool["name"]},
+            },
+        }
+        for custom_id, video, chunk in _chunk_requests(videos)
+    ]
+
+
+def _merge_chunk_results(
+    items: Iterable[tuple[str, LLMExtractionResult | None]],
+) -> dict[str, LLMExtractionResult]:
+    """
+    Merge per-request results into one extraction result per video.
+
+    Chunk results are merged in chunk order. A video with any failed chunk (a None
+    result) is left out rather than returned with partial results.
+    """
+    chunks: dict[str, list[tuple[int, LLMExtractionResult]]] = defaultdict(list)
+    failed: set[str] = set()
+    for custom_id, result in items:
+        video_id, _, idx = custom_id.rpartition("-")
+        if result is None:
+            failed.add(video_id)
+        else:
+            chunks[video_id].append((int(idx), result))
+
+    return {
+        video_id: _merge_extraction_results([result for _, result in sorted(results)])
+        for video_id, results in chunks.items()
+        if video_id not in failed
+    }
+
+
+def parse_batch_output(output: str) -> dict[str, LLMExtractionResult]:
+    """
+    Parse OpenAI Batch API JSONL output into one extraction result per video.
+
+    Args:
+        output: Batch output file contents
+
+    Returns:
+        Mapping of video ID to extraction result
+    """
+    items: list[tuple[str, LLMExtractionResult | None]] = []
+    for line in output.splitlines():
+        if not line.strip():
+            continue
+        item = orjson.loads(line)
+        response = item.get("response") or {}
+        try:
+            if response.get("status_code") != 200:
+                raise ValueError(f"status {response.get('status_code')}: {item.get('error')}")
+            content = response["body"]["choices"][0]["message"]["content"]
+            items.append((item["custom_id"], LLMExtractionResult.model_validate_json(content)))
+        except (KeyError, IndexError, ValueError, ValidationError) as e:
+            logger.warning("Batch extraction failed for request %s: %s", item["custom_id"], e)
+            items.append((item["custom_id"], None))
+    return _merge_chunk_results(items)
+
+
+def parse_anthropic_batch_results(entries: Iterable) -> dict[str, LLMExtractionResult]:
+    """
+    Parse Message Batches API results into one extraction result per video.
+
+    Args:
+        entries: Batch result entries, each with a custom_id and result
+
+    Returns:
+        Mapping of video ID to extraction result
+    """
+    items: list[tuple[str, LLMExtractionResult | None]] = []
+    for entry in entries:
+        try:
+            if entry.result.type != "succeeded":
+                raise ValueError(f"result {entry.result.type}")
+            tool_input = next(
+                block.input for block in entry.result.message.content if block.type == "tool_use"
+            )
+            items.append((entry.custom_id, LLMExtractionResult.model_validate(tool_input)))
+        except (StopIteration, ValueError, ValidationError) as e:
+            logger.warning("Batch extraction failed for request %s: %s", entry.custom_id, e)
+            items.append((entry.custom_id, None))
+    return _merge_chunk_results(items)
+
+
+async def _submit_openai(session_id: str, videos: list[Video]) -> str:
+    """Upload the request file and create an OpenAI batch, returning its ID."""
+    client = _get_openai_client()
+    batch_input = await asyncio.to_thread(build_batch_input, videos)
+    input_file = await client.files.create(file=("extraction.jsonl", batch_input), purpose="batch")
+    batch = await client.batches.create(
+        input_file_id=input_file.id,
+        endpoint=BATCH_ENDPOINT,
+        completion_window=BATCH_COMPLETION_WINDOW,
+        metadata={"session_id": session_id},
+    )
+    return batch.id
+
+
+async def _submit_anthropic(videos: list[Video]) -> str:
+    """Create an Anthropic message batch, returning its ID."""
+    client = _get_anthropic_client()
+    requests = await asyncio.to_thread(build_anthropic_batch_requests, videos)
+    batch = await client.messages.batches.create(requests=requests)
+    return batch.id
+
+
+async def _poll_openai(batch_id: str) -> tuple[str, dict[str, LLMExtractionResult] | None]:
+    """Poll an OpenAI batch, downloading and parsing its output once completed."""
+    client = _get_openai_client()
+    batch = await client.batches.retrieve(batch_id)
+    if batch.status != "completed" or not batch.output_file_id:
+        return batch.status, None
+    output = (await client.files.content(batch.output_file_id)).text
+    return batch.status, parse_batch_output(output)
+
+
+async def _poll_anthropic(batch_id: str) -> tuple[str, dict[str, LLMExtractionResult] | None]:
+    """Poll an Anthropic message batch, collecting its results once processing has ended."""
+    client = _get_anthropic_client()
+    batch = await client.messages.batches.retrieve(batch_id)
+    if batch.processing_status != "ended":
+        return batch.processing_status, None
+    entries = [entry async for entry in await client.messages.batches.results(batch_id)]
+    return "completed", parse_anthropic_batch_results(entries)
+
+
+async def submit_extraction_batch(
+    session_id: str, videos: list[Video], provider: LLMProvider = "openai"
+) -> tuple[str | None, dict[str, PlaceExtractionResult]]:
+    """
+    Submit place extraction for videos as a provider batch job.
+
+    Videos already in the extraction cache are resolved immediately and left out
+    of the batch.
+
+    Args:
+        session_id: Session the results will be added to
+        videos: Videos with transcripts to extract
+        provider: LLM provider whose batch API to use
+
+    Returns:
+        Tuple of (batch ID to poll with collect_extraction_batch, or None if nothing
+        needed submitting; cached results keyed by video ID)
+
+    Raises:
+        LLMProviderError: If the provider's API key is missing
+        ExtractionError: If the batch cannot be submitted
+    """
+    variant = _cache_variant(provider, _model_name(provider))
+    cached: dict[str, PlaceExtractionResult] = {}
+    pending: list[Video] = []
+    for video in videos:
+        result = extraction_cache.get(video.transcript, variant)
+        if result is not None:
+            cached[video.video_id] = _to_place_extraction_result(video, result)
+        else:
+            pending.append(video)
+
+    if not pending:
+        return None, cached
+
+    try:
+        if provider == "openai":
+            batch_id = await _submit_openai(session_id, pending)
+        else:
+            batch_id = await _submit_anthropic(pending)
+    except LLMProviderError:
+        raise
+    except Exception as e:
+        error_msg = f"Failed to submit extraction batch for {len(pending)} videos: {str(e)}"
+        logger.error(error_msg)
+        raise ExtractionError(error_msg) from e
+
+    job = ExtractionBatchJob(
+        batch_id=batch_id, session_id=session_id, provider=provider, videos=pending
+    )
+    _jobs.set(batch_id, job)
+    logger.info(
+        "Submitted %s extraction batch %s with %d videos (%d served from cache)",
+        provider,
+        batch_id,
+        len(pending),
+        len(cached),
+    )
+    return batch_id, cached
+
+
+async def collect_extraction_batch(
+    batch_id: str,
+) -> tuple[ExtractionBatchJob, str, dict[str, PlaceExtractionResult]]:
+    """
+    Poll an extraction batch and collect its results once complete.
+
+    Results are handed out once: the job is forgotten after a completed (or
+    failed) poll, and extracted results are added to the extraction cache.
+
+    Args:
+        batch_id: Batch ID from submit_extraction_batch
+
+    Returns:
+        Tuple of (job, batch status, results keyed by video ID). The status is
+        "completed" once results are available; results are empty until then.
+
+    Raises:
+        InvalidBatchError: If the batch is unknown or already collected
+        ExtractionError: If the batch cannot be polled or its results downloaded
+    """
+    job = _jobs.get(batch_id)
+    if job is None:
+        raise InvalidBatchError(f"Batch {batch_id} not found or already collected")
+
+    try:
+        if job.provider == "openai":
+            status, parsed = await _poll_openai(batch_id)
+        else:
+            status, parsed = await _poll_anthropic(batch_id)
+    except Exception as e:
+        error_msg = f"Failed to collect extraction batch {batch_id}: {str(e)}"
+        logger.error(error_msg)
+        raise ExtractionError(error_msg) from e
+
+    if status != "completed" and status not in BATCH_FAILED_STATUSES:
+        return job, status, {}
+
+    # Claim the job before handing out results so concurrent polls don't apply them twice
+    if _jobs.pop(batch_id) is None:
+        raise InvalidBatchError(f"Batch {batch_id} not found or already collected")
+
+    if parsed is None:
+        logger.warning("Extraction batch %s finished without output (%s)", batch_id, status)
+        return job, status, {}
+
+    variant = _cache_variant(job.provider, _model_name(job.provider))
+    results: dict[str, PlaceExtractionResult] = {}
+    for video in job.videos:
+        result = parsed.get(video.video_id)
+        if result is None:
+            continue
+        extraction_cache.put(video.transcript, variant, result)
+        results[video.video_id] = _to_place_extraction_result(video, result)
+
+    logger.info(
+        "Collected extraction batch %s: %d/%d videos", batch_id, len(results), len(job.videos)
+    )
+    return job, status, results
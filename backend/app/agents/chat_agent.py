@@ -1,24 +1,39 @@
 """Chat agent with tools for querying places."""
 
-from typing import Any
-
-from langchain_core.tools import tool
-
-from app.models.place import Place, PlaceType
+import asyncio
+import inspect
+import re
+from itertools import islice
+from typing import Any, AsyncIterator
+
+import orjson
+from langchain_core.messages import HumanMessage, SystemMessage, ToolMessage
+from langchain_core.tools import BaseTool, tool
+
+from app.config import settings
+from app.models.place import PLACE_TYPE_MEMBERS, PlaceType
 from app.models.session import Session
 from app.observability.langfuse_client import observe
 from app.services.llm_client import LLMClient
+from app.services.session_manager import get_session_manager
 from app.utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
 
-def create_search_places_tool(places: list[Place]):
-    """Create a tool for searching places with closure over the places list."""
+def create_search_places_tool(session: Session):
+    """Create a tool for searching a session's places."""
+    # Lowercased search text, overall and grouped by type, is maintained in the
+    # session index, so creating the tool each turn doesn't re-scan every place
+    index = get_session_manager().get_index(session)
+    search_entries, entries_by_type = index.search_entries, index.search_entries_by_type
 
     @tool
     def search_places(
-        query: str = "", place_type: str = "", limit: int = 10
+        query: str = "",
+        place_type: str = "",
+        limit: int = 10,
+        keywords: list[str] | None = None,
     ) -> list[dict[str, Any]]:
         """
         Search for places by name, description, or type.
@@ -27,33 +42,39 @@ def create_search_places_tool(places: list[Place]):
             query: Search query to match against name, description, or context
             place_type: Filter by place type (restaurant, attraction, hotel, activity, other)
             limit: Maximum number of results to return
+            keywords: Alternative terms; places matching any of them are returned
 
         Returns:
             List of matching places with details
         """
-        results = places.copy()
+        matches = search_entries
 
         # Filter by type if specified
         if place_type:
-            try:
-                filter_type = PlaceType(place_type.lower())
-                results = [p for p in results if p.type == filter_type]
-            except ValueError:
-                logger.warning(f"Invalid place type: {place_type}")
+            type_value = place_type.lower()
+            if type_value in PLACE_TYPE_MEMBERS:
+                matches = entries_by_type.get(PlaceType(type_value), [])
+            else:
+                logger.warning("Invalid place type: %s", place_type)
+
+        # Filters are chained lazily, so scanning stops as soon as `limit` places
+        # match, and unfiltered searches don't touch the text at all
+        matches = iter(matches)
 
         # Filter by query if specified
         if query:
             query_lower = query.lower()
-            results = [
-                p
-                for p in results
-                if query_lower in p.name.lower()
-                or query_lower in p.description.lower()
-                or query_lower in p.mentioned_context.lower()
-            ]
+            matches = ((p, blob) for p, blob in matches if query_lower in blob)
+
+        # Filter by any-of keywords: one compiled alternation scans each blob once,
+        # however many keywords there are
+        terms = [k.lower() for k in keywords or () if k.strip()]
+        if terms:
+            pattern = re.compile("|".join(map(re.escape, terms)))
+            matches = ((p, blob) for p, blob in matches if pattern.search(blob))
 
         # Limit results
-        results = results[:limit]
+        results = [p for p, _ in islice(matches, max(limit, 0))]
 
         # Convert to dict for tool output
         return [
@@ -85,13 +106,17 @@ def create_get_transcript_tool(session: Session):
         Returns:
             Full transcript text or error message
         """
-        video = next((v for v in session.videos if v.video_id == video_id), None)
+        session_manager = get_session_manager()
+        video = session_manager.get_index(session).videos_by_id.get(video_id)
 
-        if video:
-            return f"Transcript for '{video.title}':\n\n{video.transcript}"
-        else:
+        if not video:
             return f"Video {video_id} not found in session."
 
+        transcript = session_manager.get_transcript(video_id) or video.transcript
+        if not transcript:
+            return f"Transcript for video {video_id} is no longer available."
+        return f"Transcript for '{video.title}':\n\n{transcript}"
+
     return get_video_transcript
 
 
@@ -115,6 +140,114 @@ Available place types: restaurant, attraction, hotel, activity, other
 
 Total places available: {total_places}"""
 
+# Maximum number of tool-calling rounds per chat turn before the model's
+# latest reply is returned as-is
+MAX_TOOL_ROUNDS = 3
+
+
+def _prepare_agent(session: Session, user_message: str, llm_client: LLMClient):
+    """
+    Build the tools, tool-bound model and LangChain messages for a chat turn.
+
+    Args:
+        session: User session with videos and places
+        user_message: User's message
+        llm_client: Configured LLM client
+
+    Returns:
+        Tuple of (tools, tool-bound model, LangChain messages)
+    """
+    # Create tools with session context
+    search_tool = create_search_places_tool(session)
+    transcript_tool = create_get_transcript_tool(session)
+
+    tools = [search_tool, transcript_tool]
+
+    # Bind tools to the model (cached per tool set on the client)
+    model_with_tools = llm_client.bind_tools(tools)
+
+    # Build conversation context
+    system_prompt = CHAT_SYSTEM_PROMPT.format(
+        num_videos=len(session.videos),
+        total_places=len(session.places),
+    )
+
+    # System prompt, as much recent chat history as fits the token budget, then the
+    # current message
+    history = get_session_manager().get_history_messages(
+        session, max_tokens=settings.chat_history_max_tokens
+    )
+    langchain_messages = [
+        SystemMessage(content=system_prompt),
+        *history,
+        HumanMessage(content=user_message),
+    ]
+
+    return tools, model_with_tools, langchain_messages
+
+
+async def _run_tool(tool: BaseTool, args: dict) -> Any:
+    """
+    Run a tool without blocking the event loop.
+
+    Tools with a native coroutine are awaited directly; sync tool bodies (all of
+    the session tools today) run in a worker thread.
+
+    Args:
+        tool: Tool to run
+        args: Tool arguments from the model's tool call
+
+    Returns:
+        Tool output
+    """
+    if inspect.iscoroutinefunction(getattr(tool, "coroutine", None)):
+        return await tool.ainvoke(args)
+    return await asyncio.to_thread(tool.invoke, args)
+
+
+async def _execute_tool_calls(
+    tool_calls: list[dict], tools: list, session: Session
+) -> tuple[list[ToolMessage], list[str]]:
+    """
+    Execute the model's tool calls concurrently.
+
+    Args:
+        tool_calls: Tool calls requested by the model
+        tools: Session-bound tools the model may call
+        session: User session with videos and places
+
+    Returns:
+        Tuple of (one ToolMessage per tool call, list of referenced place IDs)
+    """
+    tools_by_name = {t.name: t for t in tools}
+
+    async def _dispatch(tool_call: dict) -> Any:
+        tool = tools_by_name.get(tool_call["name"])
+        if tool is None:
+            logger.warning("Model requested unknown tool: %s", tool_call["name"])
+            return f"Unknown tool: {tool_call['name']}"
+
+        logger.info("Executing tool: %s with args: %s", tool.name, tool_call["args"])
+        return await _run_tool(tool, tool_call["args"])
+
+    results = await asyncio.gather(*[_dispatch(tc) for tc in tool_calls])
+
+    place_ids_by_key = get_session_manager().get_index(session).place_ids_by_key
+    referenced_place_ids = []
+    tool_messages = []
+    for tool_call, result in zip(tool_calls, results):
+        if tool_call["name"] == "search_places":
+            # Track referenced places by name and video_id
+            for place_dict in result:
+                place_id = place_ids_by_key.get((place_dict["name"], place_dict["video_id"]))
+                if place_id:
+                    referenced_place_ids.append(place_id)
+
+        content = result if isinstance(result, str) else orjson.dumps(result).decode()
+        tool_messages.append(ToolMessage(content=content, tool_call_id=tool_call["id"]))
+
+    return tool_messages, referenced_place_ids
+
 
 @observe()
 async def chat_with_agent(
@@ -125,6 +258,9 @@ async def chat_with_agent(
     """
     Process a chat message using the agent with tools.
 
+    The model is called again with the tool results after each round of tool
+    calls, up to ``MAX_TOOL_ROUNDS`` rounds, so it can answer from them.
+
     Args:
         session: User session with videos and places
         user_message: User's message
@@ -142,109 +278,100 @@ async def chat_with_agent(
     #     span.set_attribute("places.available", len(session.places))
 
     try:
-        # Create tools with session context
-        search_tool = create_search_places_tool(session.places)
-        transcript_tool = create_get_transcript_tool(session)
-
-        tools = [search_tool, transcript_tool]
+        tools, model_with_tools, langchain_messages = _prepare_agent(
+            session, user_message, llm_client
+        )
 
-        # Bind tools to the model
-        model_with_tools = llm_client._model.bind_tools(tools)
+        referenced_place_ids = []
+        for tool_round in range(MAX_TOOL_ROUNDS + 1):
+            response = await llm_client.run_limited(
+                lambda: llm_client.ainvoke(model_with_tools, langchain_messages)
+            )
+            if not response.tool_calls:
+                break
+            if tool_round == MAX_TOOL_ROUNDS:
+                logger.warning("Tool round limit reached; returning latest reply")
+                break
+
+            tool_messages, place_ids = await _execute_tool_calls(
+                response.tool_calls, tools, session
+            )
+            referenced_place_ids.extend(place_ids)
+            langchain_messages.append(response)
+            langchain_messages.extend(tool_messages)
 
-        # Build conversation context
-        system_prompt = CHAT_SYSTEM_PROMPT.format(
-            num_videos=len(session.videos),
-            total_places=len(session.places),
-        )
+        # span.set_attribute("places.referenced", len(referenced_place_ids))
+        logger.info("Chat response generated with %d places referenced", len(referenced_place_ids))
 
-        # Convert chat history to messages
-        messages = [{"role": "system", "content": system_prompt}]
+        return response.text, referenced_place_ids
 
-        # Add recent chat history (last 10 messages)
-        for msg in session.chat_history[-10:]:
-            messages.append({"role": msg.role, "content": msg.content})
+    except Exception as e:
+        error_msg = f"Chat agent failed: {str(e)}"
+        logger.error(error_msg)
+        raise
 
-        # Add current user message
-        messages.append({"role": "user", "content": user_message})
 
-        # Convert to LangChain messages
-        from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+@observe()
+async def stream_chat_with_agent(
+    session: Session,
+    user_message: str,
+    llm_client: LLMClient,
+) -> AsyncIterator[dict[str, Any]]:
+    """
+    Process a chat message using the agent with tools, streaming the reply.
 
-        langchain_messages = []
-        for msg in messages:
-            if msg["role"] == "system":
-                langchain_messages.append(SystemMessage(content=msg["content"]))
-            elif msg["role"] == "user":
-                langchain_messages.append(HumanMessage(content=msg["content"]))
-            elif msg["role"] == "assistant":
-                langchain_messages.append(AIMessage(content=msg["content"]))
+    Yields ``{"type": "token", "text": ...}`` events as the model decodes, across
+    every tool-calling round, followed by a single
+    ``{"type": "meta", "places_referenced": [...]}`` event at the end.
 
-        # Invoke model with tools (iterative tool calling)
-        response = await model_with_tools.ainvoke(langchain_messages)
+    Args:
+        session: User session with videos and places
+        user_message: User's message
+        llm_client: Configured LLM client
 
-        # Handle tool calls if present
-        referenced_place_ids = []
-        final_response = response.content
-
-        if hasattr(response, "tool_calls") and response.tool_calls:
-            # Execute tools and get results
-            tool_results = []
-            for tool_call in response.tool_calls:
-                tool_name = tool_call["name"]
-                tool_args = tool_call["args"]
-
-                logger.info(f"Executing tool: {tool_name} with args: {tool_args}")
-
-                # Execute the tool
-                if tool_name == "search_places":
-                    result = search_tool.invoke(tool_args)
-                    tool_results.append(result)
-
-                    # Track referenced places
-                    for place_dict in result:
-                        # Find matching place by name and video_id
-                        matching_place = next(
-                            (
-                                p
-                                for p in session.places
-                                if p.name == place_dict["name"]
-                                and p.video_id == place_dict["video_id"]
-                            ),
-                            None,
-                        )
-                        if matching_place:
-                            referenced_place_ids.append(matching_place.id)
-
-                elif tool_name == "get_video_transcript":
-                    result = transcript_tool.invoke(tool_args)
-                    tool_results.append(result)
-
-            # If tools were called, we should get a follow-up response
-            # For simplicity, we'll use the tool results directly in the response
-            # In a production system, you'd want to do another LLM call with tool results
-            if tool_results and isinstance(tool_results[0], list):
-                # Format search results into response
-                places_found = tool_results[0]
-                if places_found:
-                    final_response = (
-                        f"I found {len(places_found)} relevant place(s):\n\n"
-                    )
-                    for place in places_found[:5]:  # Limit to top 5
-                        final_response += f"**{place['name']}** ({place['type']})\n"
-                        final_response += f"{place['description']}\n"
-                        final_response += f"_{place['mentioned_context']}_\n\n"
-                else:
-                    final_response = (
-                        "I couldn't find any places matching your criteria. "
-                        "Try a different search term or ask me about the available places!"
-                    )
+    Yields:
+        Token and metadata events
 
-        # span.set_attribute("places.referenced", len(referenced_place_ids))
-        logger.info(
-            f"Chat response generated with {len(referenced_place_ids)} places referenced"
+    Raises:
+        Exception: If chat processing fails
+    """
+    try:
+        tools, model_with_tools, langchain_messages = _prepare_agent(
+            session, user_message, llm_client
         )
 
-        return final_response, referenced_place_ids
+        referenced_place_ids = []
+        streamed_text = False
+        for tool_round in range(MAX_TOOL_ROUNDS + 1):
+            # Stream text tokens as they arrive, accumulating the full message
+            # so tool calls can be read once the stream finishes
+            response = None
+            separator = "\n\n" if streamed_text else ""
+            async for chunk in llm_client.stream_limited(
+                lambda: llm_client.astream(model_with_tools, langchain_messages)
+            ):
+                response = chunk if response is None else response + chunk
+                if chunk.text:
+                    streamed_text = True
+                    yield {"type": "token", "text": separator + chunk.text}
+                    separator = ""
+
+            if response is None or not response.tool_calls:
+                break
+            if tool_round == MAX_TOOL_ROUNDS:
+                logger.warning("Tool round limit reached; returning latest reply")
+                break
+
+            tool_messages, place_ids = await _execute_tool_calls(
+                response.tool_calls, tools, session
+            )
+            referenced_place_ids.extend(place_ids)
+            langchain_messages.append(response)
+            langchain_messages.extend(tool_messages)
+
+        logger.info("Chat response streamed with %d places referenced", len(referenced_place_ids))
+
+        yield {"type": "meta", "places_referenced": referenced_place_ids}
 
     except Exception as e:
         error_msg = f"Chat agent failed: {str(e)}"
@@ -1,16 +1,32 @@
 """Place extraction service using LLM."""
 
+import asyncio
+import html
+
 from pydantic import BaseModel, Field
 
+from app.models._defaults import utc_now
 from app.models.place import Place, PlaceType
 from app.models.video import Video
 from app.observability.langfuse_client import observe
-from app.services.llm_client import LLMClient
+from app.services import extraction_cache
+from app.services.llm_client import LLMClient, ModelT
 from app.utils.errors import ExtractionError
 from app.utils.logger import setup_logger
+from app.utils.tokens import count_tokens, split_by_tokens
 
 logger = setup_logger(__name__)
 
+# Transcripts longer than this are extracted in overlapping chunks
+TRANSCRIPT_CHUNK_TOKENS = 4000
+TRANSCRIPT_CHUNK_OVERLAP_TOKENS = 200
+
+# Short transcripts are packed into one extraction call up to this many tokens
+BATCH_EXTRACTION_MAX_TOKENS = 12_000
+# ...and at most this many videos, since the reply (decoded serially) grows with
+# each video's places and long enumerations are where the model starts omitting entries
+BATCH_EXTRACTION_MAX_VIDEOS = 8
+
 
 # Structured output schema for place extraction
 class ExtractedPlace(BaseModel):
@@ -30,8 +46,34 @@ class ExtractedPlace(BaseModel):
     )
 
 
+class LLMExtractionResult(BaseModel):
+    """Schema for the structured LLM output: title, summary and places in one call."""
+
+    suggested_title: str = Field(
+        description="A short, human-readable 3-5 word title for this video based on its content"
+    )
+    suggested_summary: str = Field(
+        description="A concise 1-2 sentence summary of the video based on its content"
+    )
+    places: list[ExtractedPlace] = Field(description="List of extracted places")
+
+
+class BatchedVideoExtraction(LLMExtractionResult):
+    """Schema for one video's results within a batched extraction."""
+
+    video_id: str = Field(description="The id attribute of the <video> tag these results are for")
+
+
+class BatchExtractionResult(BaseModel):
+    """Schema for extracting several videos in a single LLM call."""
+
+    videos: list[BatchedVideoExtraction] = Field(
+        description="One entry per input video, in the same order as the input"
+    )
+
+
 class PlaceExtractionResult(BaseModel):
-    """Schema for extraction result containing multiple places."""
+    """Extraction result containing multiple places tied to their source video."""
 
     suggested_title: str = Field(
         description="A short, human-readable 3-5 word title for this video based on its content"
@@ -74,146 +116,384 @@ Skip places that are just mentioned in passing without any recommendation.
 
 Be thorough but accurate. If unsure about a place's details, it's better to skip it."""
 
+# Shared, byte-identical system message so every extraction call starts with the
+# same prefix and can reuse the provider's prompt cache
+_SYSTEM_MSG = {"role": "system", "content": EXTRACTION_SYSTEM_PROMPT}
 
-# SUMMARY_SYSTEM_PROMPT = """You are an expert at summarizing travel video content.
 
-# Create a concise 2-3 sentence summary of the video that highlights:
-# 1. The location/destination featured
-# 2. The main types of recommendations (restaurants, hotels, activities, etc.)
-# 3. The overall vibe or theme of the recommendations
+def _chunk_transcript(
+    text: str,
+    max_tokens: int = TRANSCRIPT_CHUNK_TOKENS,
+    overlap: int = TRANSCRIPT_CHUNK_OVERLAP_TOKENS,
+) -> list[str]:
+    """Split a transcript into overlapping token windows (one window if it fits)."""
+    return split_by_tokens(text, max_tokens=max_tokens, overlap=overlap)
 
-# Be engaging and informative."""
 
+def _build_messages(video: Video, transcript: str) -> list[dict]:
+    """Build the extraction prompt for a video (or a chunk of its transcript)."""
+    user_prompt = f"""Video Title: {video.title}
+Description: {video.description or "N/A"}
 
-@observe(as_type="generation")
-async def extract_places_from_video(
-    video: Video, llm_client: LLMClient
-) -> PlaceExtractionResult:
-    """
-    Extract places from a video transcript using LLM.
+Transcript:
+{transcript}
 
-    Args:
-        video: Video object with transcript
-        llm_client: Configured LLM client
+Extract all recommended places from this travel video transcript."""
 
-    Returns:
-        Tuple of (list of extracted Place objects, suggested video title)
+    return [_SYSTEM_MSG, {"role": "user", "content": user_prompt}]
 
-    Raises:
-        ExtractionError: If extraction fails
-    """
-    # with tracer.start_as_current_span("extract_places") as span:
-    #     span.set_attribute("video.id", video.video_id)
-    #     span.set_attribute("transcript.length", len(video.transcript))
-    #     span.set_attribute("llm.provider", llm_client.provider)
 
-    try:
-        # Build user prompt with video context
-        user_prompt = f"""Video Title: {video.title}
+def _build_batch_messages(videos: list[Video]) -> list[dict]:
+    """Build a single extraction prompt covering several videos."""
+    video_blocks = "\n\n".join(
+        f"""<video id="{html.escape(video.video_id)}" title="{html.escape(video.title)}">
 Description: {video.description or "N/A"}
 
 Transcript:
 {video.transcript}
+</video>"""
+        for video in videos
+    )
+    user_prompt = f"""The following {len(videos)} travel video transcripts are each wrapped in a
+<video> tag. Apply the task to each video independently and return one entry per video in
+`videos`, in the same order, with `video_id` set to the tag's id attribute.
 
-Extract all recommended places from this travel video transcript."""
+{video_blocks}
 
-        messages = [
-            {"role": "system", "content": EXTRACTION_SYSTEM_PROMPT},
-            {"role": "user", "content": user_prompt},
-        ]
+Extract all recommended places from each of these travel video transcripts."""
 
-        # Use structured output to get places and suggested title
-        result: PlaceExtractionResult = await llm_client.invoke_structured(
-            messages, PlaceExtractionResult
-        )
+    return [_SYSTEM_MSG, {"role": "user", "content": user_prompt}]
 
-        # Get suggested title
-        suggested_title = result.suggested_title or f"Video {video.video_id}"
 
-        # Get summary of video
-        suggested_summary = result.suggested_summary or ""
+def _to_place_extraction_result(
+    video: Video, result: LLMExtractionResult
+) -> PlaceExtractionResult:
+    """
+    Convert an LLM extraction result into Place models tied to the video.
+
+    The fields were already validated as ExtractedPlace, so the models are built
+    with model_construct and skip a second validation pass.
 
-        # Convert to Place models with video_id
-        places = [
-            Place(
+    Places are bulk-created and held for the session's lifetime, so they're kept
+    lean: they share one creation timestamp, and get an empty fields-set rather
+    than a per-instance set of every field name (nothing here relies on
+    exclude_unset), which roughly halves their memory footprint.
+    """
+    created_at = utc_now()
+    return PlaceExtractionResult.model_construct(
+        places=[
+            Place.model_construct(
+                set(),
                 name=p.name,
                 type=p.type,
                 description=p.description,
                 video_id=video.video_id,
                 timestamp_seconds=p.timestamp_seconds,
                 mentioned_context=p.mentioned_context,
+                created_at=created_at,
             )
             for p in result.places
+        ],
+        suggested_title=result.suggested_title or f"Video {video.video_id}",
+        suggested_summary=result.suggested_summary or "",
+    )
+
+
+def _merge_extraction_results(results: list[LLMExtractionResult]) -> LLMExtractionResult:
+    """
+    Merge per-chunk extraction results into one.
+
+    Places are deduplicated by case-insensitive name. The first non-null timestamp
+    wins and distinct creator comments are concatenated. Title and summary come
+    from the first chunk, which covers the video's introduction.
+    """
+    merged: dict[str, ExtractedPlace] = {}
+    for result in results:
+        for place in result.places:
+            key = place.name.lower().strip()
+            existing = merged.get(key)
+            if existing is None:
+                merged[key] = place.model_copy()
+                continue
+            if existing.timestamp_seconds is None:
+                existing.timestamp_seconds = place.timestamp_seconds
+            if place.mentioned_context not in existing.mentioned_context:
+                existing.mentioned_context += f" {place.mentioned_context}"
+
+    return LLMExtractionResult(
+        suggested_title=results[0].suggested_title,
+        suggested_summary=results[0].suggested_summary,
+        places=list(merged.values()),
+    )
+
+
+def _cache_variant(provider: str, model: str) -> str:
+    """Identify the provider, model and prompt an extraction result was produced with."""
+    return f"{provider}|{model}|{EXTRACTION_SYSTEM_PROMPT}"
+
+
+async def _invoke_structured(
+    llm_client: LLMClient, messages: list[dict], schema: type[ModelT]
+) -> ModelT:
+    """Run a structured extraction call, using OpenAI's JSON-schema fast path when available."""
+    if llm_client.provider == "openai":
+        return await llm_client.invoke_json_schema(messages, schema)
+    return await llm_client.invoke_structured(messages, schema)
+
+
+async def _invoke_extraction(video: Video, llm_client: LLMClient) -> LLMExtractionResult:
+    """
+    Run the structured extraction LLM call for a video.
+
+    Long transcripts are split into overlapping chunks that are extracted
+    concurrently and merged, so each call's prefill stays bounded and wall time
+    tracks the largest chunk rather than the whole transcript.
+    """
+    # Tokenizing is CPU-bound; tiktoken releases the GIL, so a worker thread keeps
+    # it off the event loop without pickling transcripts to a process pool
+    chunks = await asyncio.to_thread(_chunk_transcript, video.transcript)
+    if len(chunks) == 1:
+        return await _invoke_structured(
+            llm_client, _build_messages(video, video.transcript), LLMExtractionResult
+        )
+
+    logger.info("Splitting transcript for video %s into %d chunks", video.video_id, len(chunks))
+    results = await asyncio.gather(
+        *[
+            _invoke_structured(llm_client, _build_messages(video, chunk), LLMExtractionResult)
+            for chunk in chunks
         ]
+    )
+    return _merge_extraction_results(results)
 
-        # span.set_attribute("places.extracted", len(places))
-        # span.set_attribute("suggested_title", suggested_title)
-        logger.info(
-            f"Extracted {len(places)} places from video {video.video_id}, "
-            f"suggested title: {suggested_title}"
+
+@observe(as_type="generation")
+async def extract_places_from_video(
+    video: Video, llm_client: LLMClient
+) -> PlaceExtractionResult:
+    """
+    Extract places, a suggested title and a summary from a video transcript.
+
+    Title, summary and places are requested in a single structured LLM call. Results
+    are cached per video, so re-ingesting a known video skips the LLM entirely.
+
+    Args:
+        video: Video object with transcript
+        llm_client: Configured LLM client
+
+    Returns:
+        PlaceExtractionResult with Place objects, suggested title and summary
+
+    Raises:
+        ExtractionError: If extraction fails
+    """
+    # with tracer.start_as_current_span("extract_places") as span:
+    #     span.set_attribute("video.id", video.video_id)
+    #     span.set_attribute("transcript.length", len(video.transcript))
+    #     span.set_attribute("llm.provider", llm_client.provider)
+
+    try:
+        variant = _cache_variant(llm_client.provider, llm_client.get_model_name())
+        result, cache_hit = await extraction_cache.get_or_compute(
+            video.transcript, variant, lambda: _invoke_extraction(video, llm_client)
         )
+        if cache_hit:
+            logger.info("Extraction cache hit for video %s", video.video_id)
+
+        extraction = _to_place_extraction_result(video, result)
 
-        return PlaceExtractionResult(
-            places=places,
-            suggested_title=suggested_title,
-            suggested_summary=suggested_summary,
+        # span.set_attribute("places.extracted", len(extraction.places))
+        # span.set_attribute("suggested_title", extraction.suggested_title)
+        logger.info(
+            "Extracted %d places from video %s, suggested title: %s",
+            len(extraction.places),
+            video.video_id,
+            extraction.suggested_title,
         )
 
+        return extraction
+
     except Exception as e:
         error_msg = f"Failed to extract places from video {video.video_id}: {str(e)}"
         logger.error(error_msg)
         raise ExtractionError(error_msg) from e
 
 
-# @observe(as_type="generation")
-# async def generate_video_summary(
-#     video: Video, places: list[Place], llm_client: LLMClient
-# ) -> str:
-#     """
-#     Generate a summary of the video based on transcript and extracted places.
+async def extract_places_from_videos(
+    videos: list[Video], llm_client: LLMClient
+) -> list[PlaceExtractionResult | ExtractionError]:
+    """
+    Extract places from several videos concurrently, one LLM call per video.
+
+    Each video's title and summary come from the same call as its places, so a
+    video's whole extraction finishes as soon as its own call does. Outbound
+    concurrency is bounded by the LLM client's provider limit.
+
+    Args:
+        videos: Videos with transcripts
+        llm_client: Configured LLM client
+
+    Returns:
+        One entry per input video, in order: its PlaceExtractionResult, or the
+        ExtractionError raised for it
+    """
+    return await asyncio.gather(
+        *[extract_places_from_video(video, llm_client) for video in videos],
+        return_exceptions=True,
+    )
+
+
+class VideoGroupPacker:
+    """
+    Incrementally pack videos into groups that can share one extraction call.
+
+    Videos are packed in the order they're added until the group's combined
+    transcript tokens would exceed max_tokens or it holds max_videos. Transcripts
+    too long for a single extraction chunk always get a group of their own, so
+    they go through the chunked per-video path.
+    """
 
-#     Args:
-#         video: Video object
-#         places: List of extracted places
-#         llm_client: Configured LLM client
+    def __init__(
+        self,
+        max_tokens: int = BATCH_EXTRACTION_MAX_TOKENS,
+        max_videos: int = BATCH_EXTRACTION_MAX_VIDEOS,
+    ):
+        """
+        Initialize an empty packer.
+
+        Args:
+            max_tokens: Token budget for the combined transcripts in one group
+            max_videos: Maximum number of videos in one group
+        """
+        self.max_tokens = max_tokens
+        self.max_videos = max_videos
+        self._current: list[Video] = []
+        self._current_tokens = 0
+
+    def add(self, video: Video, tokens: int) -> list[list[Video]]:
+        """
+        Add a video to the packer.
+
+        Args:
+            video: Video to extract
+            tokens: Token count of the video's transcript
+
+        Returns:
+            Groups that are complete and ready for extraction (possibly none)
+        """
+        if tokens > TRANSCRIPT_CHUNK_TOKENS:
+            return [[video]]
+
+        ready: list[list[Video]] = []
+        if self._current and (
+            self._current_tokens + tokens > self.max_tokens
+            or len(self._current) >= self.max_videos
+        ):
+            ready.append(self._current)
+            self._current, self._current_tokens = [], 0
+        self._current.append(video)
+        self._current_tokens += tokens
+        return ready
+
+    @property
+    def pending(self) -> list[Video]:
+        """The partially filled group (a new list object each time a group starts)."""
+        return self._current
+
+    def flush(self) -> list[list[Video]]:
+        """Return the partially filled group, if any, and reset the packer."""
+        ready = [self._current] if self._current else []
+        self._current, self._current_tokens = [], 0
+        return ready
+
+
+def group_videos_for_batching(
+    videos: list[Video], max_tokens: int = BATCH_EXTRACTION_MAX_TOKENS
+) -> list[list[Video]]:
+    """
+    Pack videos into groups that can share one extraction call.
 
-#     Returns:
-#         Summary text
+    See VideoGroupPacker for the packing rules.
 
-#     Raises:
-#         ExtractionError: If summary generation fails
-#     """
-#     # with tracer.start_as_current_span("generate_summary") as span:
-#     #     span.set_attribute("video.id", video.video_id)
-#     #     span.set_attribute("places.count", len(places))
+    Args:
+        videos: Videos to extract
+        max_tokens: Token budget for the combined transcripts in one group
 
-#     try:
-#         # Build context about places
-#         places_context = "\n".join(
-#             [
-#                 f"- {p.name} ({p.type}): {p.mentioned_context}"
-#                 for p in places[:10]  # Limit to first 10 for context
-#             ]
-#         )
+    Returns:
+        List of video groups, covering every input video
+    """
+    packer = VideoGroupPacker(max_tokens)
+    groups: list[list[Video]] = []
+    for video in videos:
+        groups.extend(packer.add(video, count_tokens(video.transcript)))
+    groups.extend(packer.flush())
+    return groups
 
-#         user_prompt = f"""Video Title: {video.title}
 
-# Extracted Places:
-# {places_context}
+@observe(as_type="generation")
+async def extract_places_from_videos_batched(
+    videos: list[Video], llm_client: LLMClient
+) -> list[PlaceExtractionResult | None]:
+    """
+    Extract places from several short videos with a single LLM call.
 
-# Create a concise summary of this travel video."""
+    The shared system prompt is prefilled once for the whole group instead of once
+    per video. Cached videos are served from the extraction cache and left out of
+    the prompt.
 
-#         messages = [
-#             {"role": "system", "content": SUMMARY_SYSTEM_PROMPT},
-#             {"role": "user", "content": user_prompt},
-#         ]
+    Args:
+        videos: Videos to extract (see group_videos_for_batching)
+        llm_client: Configured LLM client
 
-#         summary = await llm_client.invoke(messages)
+    Returns:
+        One result per input video, in order. An entry is None if the model omitted
+        that video, in which case the caller should extract it individually.
 
-#         logger.info(f"Generated summary for video {video.video_id}")
-#         return summary.strip()
+    Raises:
+        ExtractionError: If the batched LLM call fails
+    """
+    results: dict[str, LLMExtractionResult] = {}
+    pending: dict[str, Video] = {}
+    variant = _cache_variant(llm_client.provider, llm_client.get_model_name())
+    for video in videos:
+        cached = extraction_cache.get(video.transcript, variant)
+        if cached is not None:
+            results[video.video_id] = cached
+        else:
+            pending[video.video_id] = video
+
+    if pending:
+        try:
+            batch: BatchExtractionResult = await _invoke_structured(
+                llm_client, _build_batch_messages(list(pending.values())), BatchExtractionResult
+            )
+        except Exception as e:
+            error_msg = f"Failed to extract places from {len(pending)} batched videos: {str(e)}"
+            logger.error(error_msg)
+            raise ExtractionError(error_msg) from e
+
+        for item in batch.videos:
+            video = pending.get(item.video_id)
+            if video is None or item.video_id in results:
+                continue
+            result = LLMExtractionResult(
+                suggested_title=item.suggested_title,
+                suggested_summary=item.suggested_summary,
+                places=item.places,
+            )
+            results[item.video_id] = result
+            extraction_cache.put(video.transcript, variant, result)
+
+    logger.info(
+        "Batched extraction covered %d/%d videos (%d sent to the LLM)",
+        len(results),
+        len(videos),
+        len(pending),
+    )
 
-#     except Exception as e:
-#         error_msg = f"Failed to generate summary for video {video.video_id}: {str(e)}"
-#         logger.error(error_msg)
-#         raise ExtractionError(error_msg) from e
+    return [
+        _to_place_extraction_result(video, results[video.video_id])
+        if video.video_id in results
+        else None
+        for video in videos
+    ]
@@ -1,5 +1,8 @@
 """Clerk authentication for FastAPI."""
 
+import asyncio
+import time
+from functools import lru_cache
 from typing import Annotated
 
 import httpx
@@ -8,12 +11,133 @@ from clerk_backend_api.security.types import AuthenticateRequestOptions
 from fastapi import Depends, HTTPException, Request, status
 
 from app.config import settings
+from app.services.http_client import get_http_client, on_http_client_closed
+from app.utils.cache import TTLCache
 from app.utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
-# Initialize Clerk client
-clerk_client = Clerk(bearer_auth=settings.clerk_secret_key)
+
+@lru_cache(maxsize=1)
+def get_clerk_client() -> Clerk:
+    """
+    Get the Clerk client, creating it on first use.
+
+    Async calls go through the shared connection pool. The client is rebuilt
+    after the pool is closed (e.g. on app shutdown), so a restarted app never
+    uses the closed one.
+    """
+    return Clerk(bearer_auth=settings.clerk_secret_key, async_client=get_http_client())
+
+
+on_http_client_closed(get_clerk_client.cache_clear)
+
+# User details rarely change, so cache them to skip the Clerk API round-trip
+# on repeat requests from the same user
+_user_cache: TTLCache[str, dict] = TTLCache(
+    maxsize=10_000, ttl_seconds=settings.clerk_user_cache_ttl_seconds
+)
+
+# Verified token claims keyed by the raw bearer token, so repeat requests with the
+# same session token skip signature verification (Clerk's SDK already caches JWKS)
+_token_cache: TTLCache[str, dict] = TTLCache(
+    maxsize=4096, ttl_seconds=settings.clerk_token_cache_ttl_seconds
+)
+
+
+def _bearer_token(request: Request) -> str | None:
+    """Get the bearer token from the Authorization header, if any."""
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    return token if scheme.lower() == "bearer" and token else None
+
+
+def _get_cached_claims(token: str) -> dict | None:
+    """Get previously verified claims for a token, unless the token has since expired."""
+    payload = _token_cache.get(token)
+    if payload is None:
+        return None
+    if payload["exp"] <= time.time():
+        _token_cache.pop(token)
+        return None
+    return payload
+
+
+async def _verify_request(request: Request) -> dict:
+    """
+    Verify the request's Clerk session token.
+
+    Args:
+        request: FastAPI request object
+
+    Returns:
+        dict: Verified token claims
+
+    Raises:
+        HTTPException: 401 if the token is invalid or missing
+    """
+    # Convert FastAPI request to httpx.Request for Clerk SDK
+    httpx_request = httpx.Request(
+        method=request.method,
+        url=str(request.url),
+        headers=request.headers.raw,
+    )
+
+    # Authenticate the request using Clerk's SDK (blocking, so run in a thread)
+    request_state = await asyncio.to_thread(
+        get_clerk_client().authenticate_request,
+        httpx_request,
+        AuthenticateRequestOptions(
+            authorized_parties=None,  # Optional: limit to specific domains
+        ),
+    )
+
+    # Check if the request is authenticated
+    if not request_state.is_signed_in:
+        logger.warning("Token verification failed: %s", request_state.reason)
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid authentication credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    return request_state.payload or {}
+
+
+async def _get_user_cached(user_id: str) -> dict:
+    """
+    Fetch user details from Clerk, using the in-memory cache when possible.
+
+    Uses the Clerk SDK's async call over the shared HTTP client, so it neither
+    blocks the event loop nor needs a worker thread. Failed lookups are not cached.
+
+    Args:
+        user_id: Clerk user ID
+
+    Returns:
+        dict: User information (user_id, email, first_name, last_name)
+
+    Raises:
+        Exception: If the user cannot be fetched from Clerk
+    """
+    user_info = _user_cache.get(user_id)
+    if user_info is not None:
+        return dict(user_info)
+
+    user = await get_clerk_client().users.get_async(user_id=user_id)
+    if not user:
+        raise ValueError("User not found in Clerk")
+    user_info = {
+        "user_id": user_id,
+        "email": (
+            user.email_addresses[0].email_address
+            if user.email_addresses and user.email_addresses[0]
+            else None
+        ),
+        "first_name": user.first_name,
+        "last_name": user.last_name,
+    }
+    _user_cache.set(user_id, user_info)
+    return dict(user_info)
 
 
 async def get_current_user(request: Request) -> dict:
@@ -21,7 +145,8 @@ async def get_current_user(request: Request) -> dict:
     Verify Clerk JWT token and return user information.
 
     This dependency uses Clerk's authenticate_request method to verify the JWT token
-    and returns user information.
+    and returns user information. Verified claims are cached per token until the
+    token expires, so repeat requests skip verification.
 
     Args:
         request: FastAPI request object
@@ -39,32 +164,16 @@ async def get_current_user(request: Request) -> dict:
         HTTPException: 401 if token is invalid or missing
     """
     try:
-        # Convert FastAPI request to httpx.Request for Clerk SDK
-        httpx_request = httpx.Request(
-            method=request.method,
-            url=str(request.url),
-            headers=request.headers.raw,
-        )
-
-        # Authenticate the request using Clerk's SDK
-        request_state = clerk_client.authenticate_request(
-            httpx_request,
-            AuthenticateRequestOptions(
-                authorized_parties=None,  # Optional: limit to specific domains
-            ),
-        )
-
-        # Check if the request is authenticated
-        if not request_state.is_signed_in:
-            logger.warning(f"Token verification failed: {request_state.reason}")
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid authentication credentials",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
+        # Reuse claims verified for this exact token on an earlier request
+        token = _bearer_token(request)
+        payload = _get_cached_claims(token) if token else None
+        if payload is None:
+            payload = await _verify_request(request)
+            if token and "exp" in payload:
+                _token_cache.set(token, payload)
 
         # Extract user ID from the verified token payload
-        user_id = request_state.payload.get("sub")
+        user_id = payload.get("sub")
         if not user_id:
             logger.error("Missing user ID in verified token")
             raise HTTPException(
@@ -73,27 +182,12 @@ async def get_current_user(request: Request) -> dict:
                 headers={"WWW-Authenticate": "Bearer"},
             )
 
-        # Get additional user info from Clerk API
+        # Get additional user info from Clerk API (cached)
         try:
-            user = clerk_client.users.get(user_id=user_id)
-            if not user:
-                raise ValueError("User not found in Clerk")
-            user_info = {
-                "user_id": user_id,
-                "email": (
-                    user.email_addresses[0].email_address
-                    if user.email_addresses and user.email_addresses[0]
-                    else None
-                ),
-                "first_name": user.first_name,
-                "last_name": user.last_name,
-            }
+            user_info = await _get_user_cached(user_id)
         except Exception as e:
-            payload = request_state.payload
-            if payload is None:
-                payload = {}
             # If we can't fetch user details, use basic info from token
-            logger.warning(f"Could not fetch user details from Clerk: {e}")
+            logger.warning("Could not fetch user details from Clerk: %s", e)
             user_info = {
                 "user_id": user_id,
                 "email": payload.get("email", None),
@@ -101,7 +195,7 @@ async def get_current_user(request: Request) -> dict:
                 "last_name": None,
             }
 
-        logger.info(f"Authenticated user: {user_info['user_id']}")
+        logger.info("Authenticated user: %s", user_info["user_id"])
         return user_info
 
     except HTTPException:
@@ -109,7 +203,7 @@ async def get_current_user(request: Request) -> dict:
         raise
 
     except Exception as e:
-        logger.error(f"Authentication failed: {str(e)}")
+        logger.error("Authentication failed: %s", e)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Authentication failed",
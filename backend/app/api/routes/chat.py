@@ -2,10 +2,12 @@
 
 from typing import Literal, Optional
 
+import orjson
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from pydantic import BaseModel, Field
 
-from app.agents.chat_agent import chat_with_agent
+from app.agents.chat_agent import chat_with_agent, stream_chat_with_agent
 from app.api.auth import CurrentUser
 from app.models.chat import ChatMessage
 from app.models.session import Session
@@ -47,6 +49,49 @@ class ChatResponse(BaseModel):
     sources: list[ChatSource]
 
 
+def _build_sources(session: Session, referenced_place_ids: list[str]) -> list[ChatSource]:
+    """Resolve referenced place IDs into source videos (limited to 5)."""
+    if not referenced_place_ids:
+        return []
+
+    # Maintained incrementally per session, so each lookup is O(1) without re-indexing
+    index = get_session_manager().get_index(session)
+    places_by_id, videos_by_id = index.places_by_id, index.videos_by_id
+
+    sources = []
+    for place_id in referenced_place_ids[:5]:  # Limit to 5 sources
+        place = places_by_id.get(place_id)
+        if place:
+            video = videos_by_id.get(place.video_id)
+            if video:
+                sources.append(
+                    ChatSource(
+                        video_id=video.video_id,
+                        title=video.title,
+                        timestamp=place.timestamp_seconds,
+                    )
+                )
+    return sources
+
+
+def _record_chat_turn(
+    session: Session, user_message: str, response_text: str, referenced_place_ids: list[str]
+) -> None:
+    """Append a user/assistant exchange to the session's chat history and save it."""
+    # Inputs are already validated strings, so skip model validation
+    user_msg = ChatMessage.model_construct(role="user", content=user_message, places_referenced=[])
+    assistant_msg = ChatMessage.model_construct(
+        role="assistant",
+        content=response_text,
+        places_referenced=referenced_place_ids,
+    )
+
+    session.chat_history.append(user_msg)
+    session.chat_history.append(assistant_msg)
+
+    get_session_manager().update_session(session)
+
+
 @router.post("/chat", response_model=ChatResponse)
 @observe()
 async def chat(request: ChatRequest, current_user: CurrentUser):
@@ -88,7 +133,7 @@ async def chat(request: ChatRequest, current_user: CurrentUser):
         llm_client = create_llm_client(request.llm_provider)
 
         logger.info(
-            f"User {current_user['user_id']} processing chat for session {request.session_id}"
+            "User %s processing chat for session %s", current_user["user_id"], request.session_id
         )
 
         # Chat with agent
@@ -96,41 +141,14 @@ async def chat(request: ChatRequest, current_user: CurrentUser):
             session, request.message, llm_client
         )
 
-        # Add messages to chat history
-        user_msg = ChatMessage(
-            role="user", content=request.message, places_referenced=[]
-        )
-        assistant_msg = ChatMessage(
-            role="assistant",
-            content=response_text,
-            places_referenced=referenced_place_ids,
-        )
-
-        session.chat_history.append(user_msg)
-        session.chat_history.append(assistant_msg)
-
-        # Update session
-        session_manager.update_session(session)
+        # Add messages to chat history and update session
+        _record_chat_turn(session, request.message, response_text, referenced_place_ids)
 
         # Build sources from referenced places
-        sources = []
-        for place_id in referenced_place_ids[:5]:  # Limit to 5 sources
-            place = next((p for p in session.places if p.id == place_id), None)
-            if place:
-                video = next(
-                    (v for v in session.videos if v.video_id == place.video_id), None
-                )
-                if video:
-                    sources.append(
-                        ChatSource(
-                            video_id=video.video_id,
-                            title=video.title,
-                            timestamp=place.timestamp_seconds,
-                        )
-                    )
+        sources = _build_sources(session, referenced_place_ids)
 
         # span.set_attribute("places.referenced", len(referenced_place_ids))
-        logger.info(f"Chat complete with {len(referenced_place_ids)} places referenced")
+        logger.info("Chat complete with %d places referenced", len(referenced_place_ids))
 
         return ChatResponse(
             message=response_text,
@@ -139,7 +157,7 @@ async def chat(request: ChatRequest, current_user: CurrentUser):
         )
 
     except InvalidSessionError as e:
-        logger.error(f"Invalid session: {str(e)}")
+        logger.error("Invalid session: %s", e)
         raise HTTPException(status_code=404, detail=str(e)) from e
 
     except Exception as e:
@@ -148,6 +166,75 @@ async def chat(request: ChatRequest, current_user: CurrentUser):
         raise HTTPException(status_code=500, detail=error_msg) from e
 
 
+@router.post("/chat/stream")
+async def chat_stream(request: ChatRequest, current_user: CurrentUser):
+    """
+    Chat with the AI agent, streaming the reply as Server-Sent Events.
+
+    Requires authentication via Clerk JWT token in Authorization header.
+
+    Emits ``data: {"type": "token", "text": ...}`` frames as the reply is decoded,
+    then a final ``data: {"type": "meta", "places_referenced": [...], "sources": [...]}``
+    frame. Failures mid-stream are reported as a ``{"type": "error"}`` frame. The
+    assembled reply is saved to the session's chat history once the stream ends.
+
+    Args:
+        request: ChatRequest with session ID, message, and LLM provider
+        current_user: Authenticated user from Clerk JWT
+
+    Returns:
+        StreamingResponse with ``text/event-stream`` content
+
+    Raises:
+        HTTPException: If the session or LLM client cannot be set up, or unauthorized
+    """
+    try:
+        session_manager = get_session_manager()
+        session = session_manager.get_or_create_session(request.session_id)
+        llm_client = create_llm_client(request.llm_provider)
+    except Exception as e:
+        error_msg = f"Chat failed: {str(e)}"
+        logger.error(error_msg)
+        raise HTTPException(status_code=500, detail=error_msg) from e
+
+    logger.info(
+        "User %s streaming chat for session %s", current_user["user_id"], request.session_id
+    )
+
+    async def event_generator():
+        response_parts: list[str] = []
+        referenced_place_ids: list[str] = []
+        try:
+            async for event in stream_chat_with_agent(session, request.message, llm_client):
+                if event["type"] == "token":
+                    response_parts.append(event["text"])
+                elif event["type"] == "meta":
+                    referenced_place_ids = event["places_referenced"]
+                    sources = _build_sources(session, referenced_place_ids)
+                    event = {**event, "sources": [s.model_dump() for s in sources]}
+                yield b"data: " + orjson.dumps(event) + b"\n\n"
+
+        except Exception as e:
+            logger.error("Chat stream failed: %s", e)
+            yield b"data: " + orjson.dumps({"type": "error", "detail": "Chat failed"}) + b"\n\n"
+
+        finally:
+            # Persist whatever was streamed, even if the client disconnected early
+            if response_parts:
+                _record_chat_turn(
+                    session, request.message, "".join(response_parts), referenced_place_ids
+                )
+                logger.info(
+                    "Chat stream complete with %d places referenced", len(referenced_place_ids)
+                )
+
+    return StreamingResponse(
+        event_generator(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"},
+    )
+
+
 @router.get("/session/{session_id}", response_model=Session)
 async def get_session(session_id: str, current_user: CurrentUser):
     """
@@ -168,11 +255,13 @@ async def get_session(session_id: str, current_user: CurrentUser):
     try:
         session_manager = get_session_manager()
         session = session_manager.get_session(session_id)
-        logger.info(f"User {current_user['user_id']} retrieved session {session_id}")
-        return session
+        logger.info("User %s retrieved session %s", current_user["user_id"], session_id)
+        # Return the response directly so FastAPI skips re-validating the
+        # session against response_model (kept for the OpenAPI schema)
+        return ORJSONResponse(content=session.model_dump(mode="json"))
 
     except InvalidSessionError as e:
-        logger.error(f"Invalid session: {str(e)}")
+        logger.error("Invalid session: %s", e)
         raise HTTPException(status_code=404, detail=str(e)) from e
 
 
@@ -196,9 +285,9 @@ async def delete_session(session_id: str, current_user: CurrentUser):
     try:
         session_manager = get_session_manager()
         session_manager.delete_session(session_id)
-        logger.info(f"User {current_user['user_id']} deleted session {session_id}")
+        logger.info("User %s deleted session %s", current_user["user_id"], session_id)
         return {"message": f"Session {session_id} deleted successfully"}
 
     except InvalidSessionError as e:
-        logger.error(f"Invalid session: {str(e)}")
+        logger.error("Invalid session: %s", e)
         raise HTTPException(status_code=404, detail=str(e)) from e
@@ -1,26 +1,43 @@
 """Video ingestion endpoints."""
 
+import asyncio
 import time
+from collections.abc import Callable
 from typing import Optional
 
+import orjson
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from pydantic import BaseModel, Field, field_validator
 
-from app.agents.extraction import extract_places_from_video
+from app.agents.batch_extraction import collect_extraction_batch, submit_extraction_batch
+from app.agents.extraction import (
+    PlaceExtractionResult,
+    VideoGroupPacker,
+    extract_places_from_video,
+    extract_places_from_videos_batched,
+)
 from app.api.auth import CurrentUser
-from app.models.place import Place
-from app.models.video import Video
+from app.config import settings
+from app.models.session import Session
+from app.models.video import Video, VideoPublic
 from app.observability.langfuse_client import observe, propagate_attributes
-from app.services.llm_client import create_llm_client
-from app.services.session_manager import get_session_manager
-from app.services.youtube import process_video
+from app.services.llm_client import LLMClient, create_llm_client
+from app.services.session_manager import SessionManager, get_session_manager
+from app.services.youtube import canonicalize_video_url, extract_video_id, process_video
+from app.utils.errors import InvalidBatchError
 from app.utils.logger import setup_logger
+from app.utils.tokens import count_tokens
 
 logger = setup_logger(__name__)
 router = APIRouter()
 
 LLM_PROVIDER = "anthropic"
 
+# Ingestions this small wait for every transcript (no linger timeout), so short
+# videos always share one extraction call instead of paying per-call overhead each
+SINGLE_CALL_MAX_VIDEOS = 4
+
 
 class IngestRequest(BaseModel):
     """Request model for video ingestion."""
@@ -35,22 +52,233 @@ class IngestRequest(BaseModel):
     @field_validator("video_urls")
     @classmethod
     def validate_urls(cls, urls: list[str]) -> list[str]:
-        """Validate that URLs are non-empty strings."""
-        for url in urls:
-            if not url.strip():
-                raise ValueError("URLs cannot be empty")
-        return urls
+        """Validate that URLs are YouTube video URLs, normalizing and deduplicating them."""
+        return list(dict.fromkeys(canonicalize_video_url(url) for url in urls))
 
 
 class IngestResponse(BaseModel):
     """Response model for video ingestion."""
 
     session_id: str
-    videos: list[Video]
+    videos: list[VideoPublic]
     total_places: int
     processing_time_ms: int
 
 
+class BatchIngestResponse(BaseModel):
+    """Response model for deferred (batch) video ingestion."""
+
+    session_id: str
+    batch_id: str | None
+    videos: list[VideoPublic]
+    videos_pending: int
+
+
+class BatchStatusResponse(BaseModel):
+    """Response model for polling a batch ingestion."""
+
+    session_id: str
+    batch_id: str
+    status: str
+    videos: list[VideoPublic]
+    total_places: int
+
+
+def _new_video_urls(session: Session, urls: list[str]) -> list[str]:
+    """Drop URLs for videos the session already contains, so they aren't re-extracted."""
+    known_ids = {video.video_id for video in session.videos}
+    new_urls = [url for url in urls if extract_video_id(url) not in known_ids]
+    if len(new_urls) < len(urls):
+        logger.info("Skipping %d videos already in session", len(urls) - len(new_urls))
+    return new_urls
+
+
+async def _fetch_one(url: str, semaphore: asyncio.Semaphore) -> Video | None:
+    """
+    Fetch transcript and metadata for a single video.
+
+    Errors are logged and swallowed so that one bad URL doesn't abort the batch.
+
+    Args:
+        url: YouTube URL
+        semaphore: Bounds the number of outbound calls in flight
+
+    Returns:
+        Video, or None if fetching failed
+    """
+    async with semaphore:
+        logger.info("Processing video: %s", url)
+        try:
+            return await process_video(url)
+        except Exception as e:
+            logger.error("Failed to process video %s: %s", url, e)
+            return None
+
+
+async def _extract_one(
+    video: Video, llm_client: LLMClient, semaphore: asyncio.Semaphore
+) -> PlaceExtractionResult | None:
+    """Extract places for a single video, logging and swallowing failures."""
+    async with semaphore:
+        try:
+            return await extract_places_from_video(video, llm_client)
+        except Exception as e:
+            logger.error("Failed to process video %s: %s", video.url, e)
+            return None
+
+
+async def _extract_group(
+    videos: list[Video], llm_client: LLMClient, semaphore: asyncio.Semaphore
+) -> list[PlaceExtractionResult | None]:
+    """
+    Extract places for a group of videos, batching them into one LLM call if possible.
+
+    Videos missing from the batched output (or the whole group, if the batched call
+    fails) fall back to per-video extraction.
+
+    Args:
+        videos: Group of videos from group_videos_for_batching
+        llm_client: Configured LLM client
+        semaphore: Bounds the number of outbound calls in flight
+
+    Returns:
+        One result per video, in order; None if extraction failed for that video
+    """
+    results: list[PlaceExtractionResult | None] = [None] * len(videos)
+
+    if len(videos) > 1:
+        try:
+            async with semaphore:
+                results = await extract_places_from_videos_batched(videos, llm_client)
+        except Exception as e:
+            logger.warning("Batched extraction failed, extracting per video: %s", e)
+
+    missing = [idx for idx, result in enumerate(results) if result is None]
+    fallback = await asyncio.gather(
+        *[_extract_one(videos[idx], llm_client, semaphore) for idx in missing]
+    )
+    for idx, result in zip(missing, fallback):
+        results[idx] = result
+    return results
+
+
+async def _fetch_and_extract(
+    video_urls: list[str],
+    llm_client: LLMClient,
+    on_extracted: Callable[[Video, PlaceExtractionResult | None], None] | None = None,
+) -> tuple[list[Video], dict[str, PlaceExtractionResult | None]]:
+    """
+    Fetch videos and extract their places as a pipeline.
+
+    Fetchers push each transcript into a packer as soon as it arrives, and groups
+    that are ready go onto a queue drained by extraction workers. LLM calls for
+    early videos therefore overlap with transcript fetches for later ones. In
+    ingestions larger than SINGLE_CALL_MAX_VIDEOS, a partially filled group is
+    dispatched once it has waited ingest_batch_linger_seconds, so short videos
+    aren't held back by slow fetches.
+    Fetching and extraction are bounded separately, since they hit different
+    services.
+
+    Args:
+        video_urls: YouTube URLs to ingest
+        llm_client: Configured LLM client
+        on_extracted: Called with each video and its result (None if extraction
+            failed) as soon as its group finishes
+
+    Returns:
+        Tuple of (fetched videos in request order, extraction results by video ID;
+        None where extraction failed)
+    """
+    queue: asyncio.Queue[list[Video] | None] = asyncio.Queue()
+    fetch_semaphore = asyncio.Semaphore(settings.ingest_fetch_concurrency)
+    extract_semaphore = asyncio.Semaphore(settings.ingest_concurrency)
+    num_workers = min(settings.ingest_concurrency, len(video_urls))
+    packer = VideoGroupPacker()
+    linger = len(video_urls) > SINGLE_CALL_MAX_VIDEOS
+    linger_timers: set[asyncio.Task] = set()
+    fetched: dict[str, Video] = {}
+    extracted: dict[str, PlaceExtractionResult | None] = {}
+
+    async def flush_after_linger(group: list[Video]) -> None:
+        await asyncio.sleep(settings.ingest_batch_linger_seconds)
+        # Only flush if the group is still waiting to fill up
+        if packer.pending is group:
+            for ready in packer.flush():
+                queue.put_nowait(ready)
+
+    async def fetch(url: str) -> None:
+        video = await _fetch_one(url, fetch_semaphore)
+        if video is None:
+            return
+        fetched[url] = video
+        # Token counting is CPU-bound, so keep it off the event loop
+        tokens = await asyncio.to_thread(count_tokens, video.transcript)
+        pending, pending_size = packer.pending, len(packer.pending)
+        for group in packer.add(video, tokens):
+            queue.put_nowait(group)
+        # Start the linger timer when this video opened a new group
+        if linger and packer.pending and (packer.pending is not pending or pending_size == 0):
+            linger_timers.add(asyncio.create_task(flush_after_linger(packer.pending)))
+
+    async def produce() -> None:
+        try:
+            await asyncio.gather(*[fetch(url) for url in video_urls])
+            for group in packer.flush():
+                queue.put_nowait(group)
+        finally:
+            for timer in linger_timers:
+                timer.cancel()
+            # One sentinel per worker, even on failure, so no worker waits forever
+            for _ in range(num_workers):
+                queue.put_nowait(None)
+
+    async def extract() -> None:
+        while (group := await queue.get()) is not None:
+            results = await _extract_group(group, llm_client, extract_semaphore)
+            for video, result in zip(group, results):
+                extracted[video.video_id] = result
+                if on_extracted is not None:
+                    on_extracted(video, result)
+
+    await asyncio.gather(produce(), *[extract() for _ in range(num_workers)])
+    return [fetched[url] for url in video_urls if url in fetched], extracted
+
+
+def _add_to_session(
+    session_manager: SessionManager,
+    session: Session,
+    video: Video,
+    extracted_result: PlaceExtractionResult,
+) -> None:
+    """Add an extracted video and its places to the session (caller persists it)."""
+    # Use suggested title from LLM instead of placeholder
+    video.title = extracted_result.suggested_title
+    video.summary = extracted_result.suggested_summary
+    video.places_count = len(extracted_result.places)
+
+    # Move the transcript out of the session payload now extraction is done (it
+    # stays on the video if the session was dropped mid-ingest)
+    if session_manager.store_transcript(session, video.video_id, video.transcript):
+        video.transcript = ""
+
+    session.videos.append(video)
+    session.places.extend(extracted_result.places)
+
+    logger.info(
+        "Completed video %s: %d places extracted", video.video_id, len(extracted_result.places)
+    )
+
+
+def _sse_event(event: dict) -> bytes:
+    """Encode an event as a Server-Sent Events data frame."""
+    return b"data: " + orjson.dumps(event) + b"\n\n"
+
+
+def _to_public(videos: list[Video]) -> list[VideoPublic]:
+    """Strip transcripts from videos for API responses."""
+    return [VideoPublic.model_validate(video, from_attributes=True) for video in videos]
+
+
 @router.post("/ingest", response_model=IngestResponse)
 @observe()
 async def ingest_videos(request: IngestRequest, current_user: CurrentUser):
@@ -61,10 +289,10 @@ async def ingest_videos(request: IngestRequest, current_user: CurrentUser):
 
     Process:
     1. Validate YouTube URLs
-    2. Fetch transcripts for each video
-    3. Extract structured place data using LLM
-    4. Generate video summaries
-    5. Store in session
+    2. Fetch transcripts concurrently
+    3. As transcripts arrive, extract places, title and summary with one LLM call
+       per video (short transcripts are packed together into a shared call)
+    4. Store in session
 
     Args:
         request: IngestRequest with video URLs and LLM provider
@@ -89,8 +317,10 @@ async def ingest_videos(request: IngestRequest, current_user: CurrentUser):
         # Create LLM client
         llm_client = create_llm_client(LLM_PROVIDER)
         logger.info(
-            f"User {current_user['user_id']} starting ingestion of "
-            f"{len(request.video_urls)} videos using {LLM_PROVIDER}"
+            "User %s starting ingestion of %d videos using %s",
+            current_user["user_id"],
+            len(request.video_urls),
+            LLM_PROVIDER,
         )
         propagate_attributes(
             user_id=current_user["user_id"],
@@ -101,63 +331,300 @@ async def ingest_videos(request: IngestRequest, current_user: CurrentUser):
         session_manager = get_session_manager()
         session = session_manager.get_or_create_session(request.session_id)
 
-        all_places: list[Place] = []
-        success_videos: list[Video] = []
-        error_videos: list[str] = []
-
-        # Process each video
-        for idx, url in enumerate(request.video_urls):
-            logger.info(f"Processing video {idx + 1}/{len(request.video_urls)}: {url}")
-
-            try:
-                # Fetch transcript and metadata
-                video = await process_video(url)
-                session.videos.append(video)
-
-                # Extract places and get suggested title
-                extracted_result = await extract_places_from_video(video, llm_client)
-                all_places.extend(extracted_result.places)
-                session.places.extend(extracted_result.places)
-                # Use suggested title from LLM instead of placeholder
-                video.title = extracted_result.suggested_title
-                video.summary = extracted_result.suggested_summary
-                video.places_count = len(extracted_result.places)
-
-                success_videos.append(video)
-                logger.info(
-                    f"Completed video {video.video_id}: "
-                    f"{len(extracted_result.places)} places extracted"
-                )
+        # Fetch videos and extract places, packing short transcripts into shared
+        # LLM calls as they arrive
+        video_urls = _new_video_urls(session, request.video_urls)
+        videos, extracted = await _fetch_and_extract(video_urls, llm_client)
 
-            except Exception as e:
-                error_msg = f"Failed to process video {url}: {str(e)}"
-                logger.error(error_msg)
-                error_videos.append(url)
-                # Continue with other videos instead of failing completely
-                # In production, you might want to track partial failures
+        # Merge results in a single pass, in request order
+        total_places = 0
+        success_videos: list[Video] = []
+        for video in videos:
+            extracted_result = extracted.get(video.video_id)
+            if extracted_result is None:
                 continue
 
+            _add_to_session(session_manager, session, video, extracted_result)
+            total_places += len(extracted_result.places)
+            success_videos.append(video)
+
         # Update session
         session_manager.update_session(session)
 
         # Calculate processing time
         processing_time_ms = int((time.time() - start_time) * 1000)
-        # span.set_attribute("places.total", len(all_places))
+        # span.set_attribute("places.total", total_places)
         # span.set_attribute("processing_time_ms", processing_time_ms)
 
         logger.info(
-            f"Ingestion complete: {len(success_videos)} videos, "
-            f"{len(all_places)} places, {processing_time_ms}ms"
+            "Ingestion complete: %d videos, %d places, %dms",
+            len(success_videos),
+            total_places,
+            processing_time_ms,
         )
 
-        return IngestResponse(
-            session_id=session.session_id,
-            videos=success_videos,
-            total_places=len(all_places),
-            processing_time_ms=processing_time_ms,
+        # Return the response directly so FastAPI skips re-validating it against
+        # response_model (kept for the OpenAPI schema)
+        return ORJSONResponse(
+            content=IngestResponse(
+                session_id=session.session_id,
+                videos=_to_public(success_videos),
+                total_places=total_places,
+                processing_time_ms=processing_time_ms,
+            ).model_dump(mode="json")
         )
 
     except Exception as e:
         error_msg = f"Video ingestion failed: {str(e)}"
         logger.error(error_msg)
         raise HTTPException(status_code=500, detail=error_msg) from e
+
+
+@router.post("/ingest/stream")
+async def ingest_videos_stream(request: IngestRequest, current_user: CurrentUser):
+    """
+    Ingest YouTube videos, streaming each video's results as Server-Sent Events.
+
+    Requires authentication via Clerk JWT token in Authorization header.
+
+    Emits a ``data: {"type": "session", "session_id": ...}`` frame first, then a
+    ``{"type": "video", "video": {...}, "places": [...]}`` frame as each video is
+    extracted (in completion order), and a final ``{"type": "done",
+    "videos_ingested": ..., "videos_failed": ..., "total_places": ...,
+    "processing_time_ms": ...}`` frame. Failures mid-stream are reported as a
+    ``{"type": "error"}`` frame. Each video is saved to the session as it completes.
+
+    Args:
+        request: IngestRequest with video URLs
+        current_user: Authenticated user from Clerk JWT
+
+    Returns:
+        StreamingResponse with ``text/event-stream`` content
+
+    Raises:
+        HTTPException: If the session or LLM client cannot be set up, or unauthorized
+    """
+    start_time = time.time()
+
+    try:
+        llm_client = create_llm_client(LLM_PROVIDER)
+        session_manager = get_session_manager()
+        session = session_manager.get_or_create_session(request.session_id)
+    except Exception as e:
+        error_msg = f"Video ingestion failed: {str(e)}"
+        logger.error(error_msg)
+        raise HTTPException(status_code=500, detail=error_msg) from e
+
+    logger.info(
+        "User %s streaming ingestion of %d videos using %s",
+        current_user["user_id"],
+        len(request.video_urls),
+        LLM_PROVIDER,
+    )
+    video_urls = _new_video_urls(session, request.video_urls)
+
+    async def event_generator():
+        completed: asyncio.Queue[tuple[Video, PlaceExtractionResult | None] | None] = (
+            asyncio.Queue()
+        )
+
+        async def run_pipeline() -> None:
+            try:
+                await _fetch_and_extract(
+                    video_urls,
+                    llm_client,
+                    lambda video, result: completed.put_nowait((video, result)),
+                )
+            finally:
+                completed.put_nowait(None)
+
+        pipeline = asyncio.create_task(run_pipeline())
+        videos_ingested = 0
+        total_places = 0
+        try:
+            yield _sse_event({"type": "session", "session_id": session.session_id})
+
+            while (item := await completed.get()) is not None:
+                video, extracted_result = item
+                if extracted_result is None:
+                    continue
+                _add_to_session(session_manager, session, video, extracted_result)
+                session_manager.update_session(session)
+                videos_ingested += 1
+                total_places += len(extracted_result.places)
+                yield _sse_event(
+                    {
+                        "type": "video",
+                        "video": _to_public([video])[0].model_dump(mode="json"),
+                        "places": [
+                            place.model_dump(mode="json") for place in extracted_result.places
+                        ],
+                    }
+                )
+            await pipeline
+
+            processing_time_ms = int((time.time() - start_time) * 1000)
+            logger.info(
+                "Streaming ingestion complete: %d videos, %d places, %dms",
+                videos_ingested,
+                total_places,
+                processing_time_ms,
+            )
+            yield _sse_event(
+                {
+                    "type": "done",
+                    "videos_ingested": videos_ingested,
+                    "videos_failed": len(video_urls) - videos_ingested,
+                    "total_places": total_places,
+                    "processing_time_ms": processing_time_ms,
+                }
+            )
+
+        except Exception as e:
+            logger.error("Ingestion stream failed: %s", e)
+            yield _sse_event({"type": "error", "detail": "Video ingestion failed"})
+
+        finally:
+            # Stop outstanding fetches and LLM calls if the client disconnected early
+            pipeline.cancel()
+
+    return StreamingResponse(
+        event_generator(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"},
+    )
+
+
+@router.post("/ingest/batch", response_model=BatchIngestResponse)
+@observe()
+async def ingest_videos_batch(request: IngestRequest, current_user: CurrentUser):
+    """
+    Ingest YouTube videos with deferred, lower-cost extraction.
+
+    Requires authentication via Clerk JWT token in Authorization header.
+
+    Transcripts are fetched up front and place extraction is submitted to the
+    provider's batch API (OpenAI Batch or Anthropic Message Batches), which costs
+    about half as much as synchronous calls but may take up to 24 hours. Videos
+    already in the extraction cache are added to the session immediately.
+    Poll GET /ingest/batch/{batch_id} for the rest.
+
+    Args:
+        request: IngestRequest with video URLs
+        current_user: Authenticated user from Clerk JWT
+
+    Returns:
+        BatchIngestResponse with session ID, batch ID and any videos resolved from cache
+
+    Raises:
+        HTTPException: If submission fails or unauthorized
+    """
+    try:
+        logger.info(
+            "User %s starting batch ingestion of %d videos",
+            current_user["user_id"],
+            len(request.video_urls),
+        )
+        propagate_attributes(
+            user_id=current_user["user_id"],
+            metadata={"llm_provider": LLM_PROVIDER, "pipeline": "video_ingestion_batch"},
+        )
+
+        session_manager = get_session_manager()
+        session = session_manager.get_or_create_session(request.session_id)
+
+        semaphore = asyncio.Semaphore(settings.ingest_fetch_concurrency)
+        video_urls = _new_video_urls(session, request.video_urls)
+        fetched = await asyncio.gather(*[_fetch_one(url, semaphore) for url in video_urls])
+        videos = [video for video in fetched if video is not None]
+
+        batch_id, cached = await submit_extraction_batch(
+            session.session_id, videos, LLM_PROVIDER
+        )
+
+        resolved_videos: list[Video] = []
+        for video in videos:
+            if video.video_id in cached:
+                _add_to_session(session_manager, session, video, cached[video.video_id])
+                resolved_videos.append(video)
+        if resolved_videos:
+            session_manager.update_session(session)
+
+        return ORJSONResponse(
+            content=BatchIngestResponse(
+                session_id=session.session_id,
+                batch_id=batch_id,
+                videos=_to_public(resolved_videos),
+                videos_pending=len(videos) - len(resolved_videos),
+            ).model_dump(mode="json")
+        )
+
+    except Exception as e:
+        error_msg = f"Batch video ingestion failed: {str(e)}"
+        logger.error(error_msg)
+        raise HTTPException(status_code=500, detail=error_msg) from e
+
+
+@router.get("/ingest/batch/{batch_id}", response_model=BatchStatusResponse)
+async def get_ingest_batch(batch_id: str, current_user: CurrentUser):
+    """
+    Poll a batch ingestion, adding its videos to the session once complete.
+
+    Requires authentication via Clerk JWT token in Authorization header.
+
+    Args:
+        batch_id: Batch ID from POST /ingest/batch
+        current_user: Authenticated user from Clerk JWT
+
+    Returns:
+        BatchStatusResponse with the batch status and, once complete, the extracted videos
+
+    Raises:
+        HTTPException: If the batch is not found, polling fails, or unauthorized
+    """
+    try:
+        job, status, results = await collect_extraction_batch(batch_id)
+
+        # Batches can outlive their session; results then start a fresh one
+        session_manager = get_session_manager()
+        session = session_manager.get_or_create_session(job.session_id)
+
+        success_videos: list[Video] = []
+        total_places = 0
+        for video in job.videos:
+            extracted_result = results.get(video.video_id)
+            if extracted_result is None:
+                continue
+            _add_to_session(session_manager, session, video, extracted_result)
+            success_videos.append(video)
+            total_places += len(extracted_result.places)
+        if success_videos:
+            session_manager.update_session(session)
+
+        logger.info(
+            "User %s polled batch %s: %s, %d videos, %d places",
+            current_user["user_id"],
+            batch_id,
+            status,
+            len(success_videos),
+            total_places,
+        )
+
+        return ORJSONResponse(
+            content=BatchStatusResponse(
+                session_id=session.session_id,
+                batch_id=batch_id,
+                status=status,
+                videos=_to_public(success_videos),
+                total_places=total_places,
+            ).model_dump(mode="json")
+        )
+
+    except InvalidBatchError as e:
+        logger.error("Invalid batch: %s", e)
+        raise HTTPException(status_code=404, detail=str(e)) from e
+
+    except Exception as e:
+        error_msg = f"Batch ingestion poll failed: {str(e)}"
+        logger.error(error_msg)
+        raise HTTPException(status_code=500, detail=error_msg) from e
@@ -1,5 +1,6 @@
 """Application configuration."""
 
+from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -12,6 +13,20 @@ class Settings(BaseSettings):
     openai_api_key: str = ""
     anthropic_api_key: str = ""
 
+    # LLM outbound concurrency (size to the account's rate limits)
+    openai_concurrency: int = Field(default=20, ge=1)
+    anthropic_concurrency: int = Field(default=10, ge=1)
+    # Providers whose calls use the sync SDK path in a worker thread, for
+    # environments where the async path is known to misbehave
+    llm_sync_fallback_providers: list[str] = []
+    # Exact-match cache of LLM replies, keyed by provider, model, messages and schema
+    llm_response_cache_ttl_seconds: int = 3600
+    llm_response_cache_max_entries: int = 1024
+
+    # Shared outbound HTTP connection pool
+    http_max_connections: int = 200
+    http_max_keepalive_connections: int = 100
+
     # Observability
     langfuse_public_key: str = ""
     langfuse_secret_key: str = ""
@@ -21,11 +36,27 @@ class Settings(BaseSettings):
     # Clerk Authentication
     clerk_secret_key: str = ""
     clerk_publishable_key: str = ""
+    clerk_user_cache_ttl_seconds: int = 300
+    clerk_token_cache_ttl_seconds: int = 300  # Upper bound; entries also expire with the token
 
     # Application
     environment: str = "development"
     log_level: str = "INFO"
     session_ttl_seconds: int = 3600
+    thread_pool_max_workers: int = 64  # Worker threads for blocking SDK calls
+
+    # Ingestion
+    ingest_concurrency: int = Field(default=5, ge=1)  # Max LLM extraction calls per request
+    ingest_fetch_concurrency: int = Field(default=10, ge=1)  # Max transcript fetches per request
+    # Max time a short video waits for others to share its extraction call
+    ingest_batch_linger_seconds: float = Field(default=2.0, ge=0)
+    extraction_cache_ttl_seconds: int = 7 * 24 * 3600
+    extraction_cache_max_entries: int = 1024
+    video_cache_ttl_seconds: int = 24 * 3600  # Fetched transcripts and metadata, by video ID
+    video_cache_max_entries: int = 1024
+
+    # Chat
+    chat_history_max_tokens: int = Field(default=4000, ge=0)  # Prior turns sent to the model
 
     # API
     cors_origins: list[str] = [
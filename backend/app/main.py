@@ -1,12 +1,18 @@
 """FastAPI application entry point."""
 
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 
+from app.api.auth import CurrentUser
 from app.api.routes import chat, ingest
 from app.config import settings
+from app.services.http_client import close_http_client
+from app.services.llm_client import get_provider_metrics
 from app.utils.logger import setup_logger
 from app.version import VERSION
 
@@ -18,6 +24,13 @@ async def lifespan(app: FastAPI):
     """Application lifespan context manager."""
     logger.info("Starting Treki API")
 
+    # Blocking SDK calls (e.g. Clerk auth) and transcript tokenizing run via
+    # asyncio.to_thread, so size the default executor for concurrent requests
+    # rather than CPU count
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=settings.thread_pool_max_workers)
+    )
+
     # Start session manager
     from app.services.session_manager import get_session_manager
 
@@ -28,6 +41,7 @@ async def lifespan(app: FastAPI):
 
     # Stop session manager
     await session_manager.stop()
+    await close_http_client()
     logger.info("Shutting down Treki API")
 
 
@@ -36,6 +50,7 @@ app = FastAPI(
     description="AI-powered travel planning from YouTube videos",
     version="0.1.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # CORS middleware
@@ -62,6 +77,17 @@ async def get_version():
     return {"version": VERSION}
 
 
+# Metrics
+@app.get("/metrics")
+async def get_metrics(current_user: CurrentUser):
+    """
+    Outbound LLM concurrency and rate-limit counters.
+
+    Requires authentication via Clerk JWT token in Authorization header.
+    """
+    return {"llm_providers": get_provider_metrics()}
+
+
 # Include routers
 app.include_router(ingest.router, prefix="/api", tags=["ingest"])
 app.include_router(chat.router, prefix="/api", tags=["chat"])
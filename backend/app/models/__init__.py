@@ -3,7 +3,7 @@
 from app.models.chat import ChatMessage
 from app.models.place import Place, PlaceType
 from app.models.session import Session
-from app.models.video import Video, VideoSummary
+from app.models.video import Video, VideoPublic, VideoSummary
 
 __all__ = [
     "ChatMessage",
@@ -11,5 +11,6 @@ __all__ = [
     "PlaceType",
     "Session",
     "Video",
+    "VideoPublic",
     "VideoSummary",
 ]
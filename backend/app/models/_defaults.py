@@ -0,0 +1,14 @@
+"""Shared default factories for data models."""
+
+import os
+from datetime import UTC, datetime
+
+
+def utc_now() -> datetime:
+    """Get the current time as a timezone-aware UTC datetime."""
+    return datetime.now(UTC)
+
+
+def new_id() -> str:
+    """Generate a random 128-bit ID as 32 hex characters (like ``uuid4().hex``)."""
+    return os.urandom(16).hex()
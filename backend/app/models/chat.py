@@ -4,11 +4,13 @@ from datetime import datetime
 
 from pydantic import BaseModel, Field
 
+from app.models._defaults import utc_now
+
 
 class ChatMessage(BaseModel):
     """Represents a chat message in a conversation."""
 
     role: str  # "user" or "assistant"
     content: str
-    timestamp: datetime = Field(default_factory=datetime.utcnow)
+    timestamp: datetime = Field(default_factory=utc_now)
     places_referenced: list[str] = Field(default_factory=list)
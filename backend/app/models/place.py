@@ -2,10 +2,11 @@
 
 from datetime import datetime
 from enum import Enum
-from uuid import uuid4
 
 from pydantic import BaseModel, Field
 
+from app.models._defaults import new_id, utc_now
+
 
 class PlaceType(str, Enum):
     """Types of places that can be extracted."""
@@ -19,14 +20,19 @@ class PlaceType(str, Enum):
     OTHER = "other"
 
 
+# Members for fast membership checks. PlaceType is a str enum, so its plain string
+# values match too (e.g. "restaurant" in PLACE_TYPE_MEMBERS).
+PLACE_TYPE_MEMBERS = frozenset(PlaceType)
+
+
 class Place(BaseModel):
     """Represents a place mentioned in a travel video."""
 
-    id: str = Field(default_factory=lambda: str(uuid4()))
+    id: str = Field(default_factory=new_id)  # 32 random hex characters
     name: str
     type: PlaceType
     description: str
     video_id: str
     timestamp_seconds: int | None = None
     mentioned_context: str
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=utc_now)
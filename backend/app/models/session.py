@@ -1,10 +1,10 @@
 """Session data models."""
 
 from datetime import datetime
-from uuid import uuid4
 
 from pydantic import BaseModel, Field
 
+from app.models._defaults import new_id, utc_now
 from app.models.chat import ChatMessage
 from app.models.place import Place
 from app.models.video import Video
@@ -13,9 +13,9 @@ from app.models.video import Video
 class Session(BaseModel):
     """Represents a user session with videos, places, and chat history."""
 
-    session_id: str = Field(default_factory=lambda: str(uuid4()))
+    session_id: str = Field(default_factory=new_id)  # 32 random hex characters
     videos: list[Video] = Field(default_factory=list)
     places: list[Place] = Field(default_factory=list)
     chat_history: list[ChatMessage] = Field(default_factory=list)
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    last_activity: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=utc_now)
+    last_activity: datetime = Field(default_factory=utc_now)
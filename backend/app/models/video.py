@@ -16,6 +16,18 @@ class Video(BaseModel):
     places_count: int | None = None
 
 
+class VideoPublic(BaseModel):
+    """A processed video as returned by the API, without its transcript."""
+
+    video_id: str
+    title: str
+    description: str | None = None
+    summary: str | None = None
+    duration_seconds: int
+    url: str
+    places_count: int | None = None
+
+
 class VideoSummary(BaseModel):
     """Summary of a processed video."""
 
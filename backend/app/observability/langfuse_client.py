@@ -1,6 +1,9 @@
 """Langfuse integration for LLM observability."""
 
-from langfuse import Langfuse, observe, propagate_attributes
+from typing import Any, Callable, TypeVar
+
+from langfuse import Langfuse, propagate_attributes
+from langfuse import observe as _langfuse_observe
 
 from app.config import settings
 from app.observability.privacy import pii_masker
@@ -9,6 +12,8 @@ from app.version import VERSION
 
 logger = setup_logger(__name__)
 
+F = TypeVar("F", bound=Callable[..., Any])
+
 # Initialize Langfuse client
 langfuse_client: Langfuse | None = None
 
@@ -27,6 +32,26 @@ else:
     logger.warning("Langfuse credentials not provided, observability will be limited")
 
 
+def observe(func: F | None = None, **kwargs: Any) -> Any:
+    """
+    Trace a function with Langfuse's ``@observe``, if Langfuse is configured.
+
+    Without credentials the decorated function is returned unwrapped, so calls
+    skip the span-capture wrapper entirely. Supports both ``@observe`` and
+    ``@observe(...)``.
+
+    Args:
+        func: Function being decorated, when used without arguments
+        **kwargs: Options passed through to Langfuse's ``observe`` (e.g. as_type)
+
+    Returns:
+        The decorated function, or a decorator if called with options only
+    """
+    if langfuse_client is None:
+        return func if func is not None else (lambda fn: fn)
+    return _langfuse_observe(func, **kwargs)
+
+
 def get_langfuse() -> Langfuse:
     """Get the Langfuse client instance."""
     if not langfuse_client:
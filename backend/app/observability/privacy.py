@@ -8,32 +8,85 @@ Contains:
 
 import re
 
+# Emails (keep first & last character of username + domain)
+_EMAIL_RE = re.compile(r"\b([\w.-])[^\s@]*?([\w.-])@(\w+?\.\w+?)\b")
+# Phone numbers (keep last 4 digits)
+_PHONE_RE = re.compile(r"\b\d{3}[-. ]?\d{3}[-. ]?(\d{4})\b")
+_DIGIT_RE = re.compile(r"\d")
+# Both patterns as one alternation, so strings that may hold either are scanned once
+_PII_RE = re.compile(rf"(?P<email>{_EMAIL_RE.pattern})|(?P<phone>{_PHONE_RE.pattern})")
+# Shortest string either pattern can match ("ab@c.d")
+_MIN_PII_LENGTH = 6
+
+_CONTAINER_TYPES = (dict, list, tuple)
+
 
 def pii_masker(data, **kwargs):
-    """Recursive wrapper to identity string and run our masker on it."""
+    """
+    Mask PII in every string within data, walking nested dicts, lists and tuples.
+
+    Containers are copied (tuples become lists) and other values are returned as is.
+    The walk uses an explicit stack rather than recursion, so deeply nested payloads
+    don't pay per-level call overhead or hit the recursion limit.
+    """
+    if type(data) is str:
+        return string_masker(data)
+    # str subclasses (e.g. str enum values) miss the exact check but still need masking
     if isinstance(data, str):
         return string_masker(data)
-    elif isinstance(data, dict):
-        # recurse
-        return {k: pii_masker(data=v) for k, v in data.items()}
-    elif isinstance(data, list) or isinstance(data, tuple):
-        # recurse
-        return [pii_masker(data=item) for item in data]
-    return data
+    if not isinstance(data, _CONTAINER_TYPES):
+        return data
+
+    root = [data]
+    stack = [(root, 0, data)]
+    while stack:
+        parent, key, value = stack.pop()
+        if isinstance(value, dict):
+            out = {}
+            items = value.items()
+        else:
+            out = [None] * len(value)
+            items = enumerate(value)
+        parent[key] = out
+
+        for k, v in items:
+            # Exact type checks first: they're cheaper than isinstance and cover
+            # nearly every value in a trace payload
+            tp = type(v)
+            if tp is str:
+                out[k] = string_masker(v)
+            elif tp is dict or tp is list or tp is tuple:
+                stack.append((out, k, v))
+            elif isinstance(v, str):
+                out[k] = string_masker(v)
+            elif isinstance(v, _CONTAINER_TYPES):
+                stack.append((out, k, v))
+            else:
+                out[k] = v
+    return root[0]
+
+
+def _redact(match: re.Match) -> str:
+    """Build the replacement for a combined-pattern match."""
+    if match.lastgroup == "email":
+        # The domain is kept verbatim, so it may still hold a phone number
+        domain = _PHONE_RE.sub(r"[REDACTED PHONE: ***\1]", match[4])
+        return f"[REDACTED EMAIL: {match[2]}***{match[3]}@{domain}]"
+    return f"[REDACTED PHONE: ***{match[6]}]"
 
 
 def string_masker(data: str) -> str:
     """Mask sensitive information in the data."""
-    # Mask email addresses (keep first & last character of username + domain)
-    data = re.sub(
-        r"\b([\w.-])[^\s@]*?([\w.-])@(\w+?\.\w+?)\b",
-        r"[REDACTED EMAIL: \1***\2@\3]",
-        data,
-    )
-    # Mask phone numbers (keep last 4 digits)
-    data = re.sub(
-        r"\b\d{3}[-. ]?\d{3}[-. ]?(\d{4})\b",
-        r"[REDACTED PHONE: ***\1]",
-        data,
-    )
+    # Most strings are too short or contain neither an "@" nor a digit, so skip the
+    # regexes entirely
+    if len(data) < _MIN_PII_LENGTH:
+        return data
+    has_email = "@" in data
+    has_phone = _DIGIT_RE.search(data) is not None
+    if has_email and has_phone:
+        return _PII_RE.sub(_redact, data)
+    if has_email:
+        return _EMAIL_RE.sub(r"[REDACTED EMAIL: \1***\2@\3]", data)
+    if has_phone:
+        return _PHONE_RE.sub(r"[REDACTED PHONE: ***\1]", data)
     return data
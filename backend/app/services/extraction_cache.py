@@ -0,0 +1,147 @@
+"""In-memory cache for LLM place extraction results.
+
+A YouTube video's transcript is stable, so re-ingesting a video (by any user) can
+reuse a previous extraction instead of paying for another LLM call. Both lookup
+tiers are keyed on the extraction variant (provider, model and system prompt), so
+changing any of those never serves an older result:
+
+1. Exact hit on the variant and transcript, which skips normalizing the transcript.
+2. Fingerprint hit on the variant and normalized transcript (lowercased words
+   only), which catches re-uploads and caption edits that only touch casing,
+   punctuation or whitespace.
+
+Concurrent misses for the same request share one computation (see get_or_compute),
+so two sessions ingesting the same video at once pay for one LLM call.
+
+TRADEOFF: Like sessions, the cache lives in process memory and is lost on restart.
+"""
+
+import asyncio
+import hashlib
+import re
+from collections.abc import Awaitable, Callable
+from typing import TypeVar
+
+from pydantic import BaseModel
+
+from app.config import settings
+from app.utils.cache import TTLCache
+
+T = TypeVar("T", bound=BaseModel)
+
+_WORD_RE = re.compile(r"\w+")
+
+_exact: TTLCache[str, BaseModel] = TTLCache(
+    maxsize=settings.extraction_cache_max_entries,
+    ttl_seconds=settings.extraction_cache_ttl_seconds,
+)
+_by_fingerprint: TTLCache[str, BaseModel] = TTLCache(
+    maxsize=settings.extraction_cache_max_entries,
+    ttl_seconds=settings.extraction_cache_ttl_seconds,
+)
+
+# In-flight computations keyed by exact key, so concurrent misses share one call
+_inflight: dict[str, asyncio.Task] = {}
+
+
+def exact_key(variant: str, transcript: str) -> str:
+    """Hash the extraction variant (provider, model and prompt) together with the transcript."""
+    return hashlib.sha256(f"{variant}|{transcript}".encode()).hexdigest()
+
+
+def transcript_fingerprint(variant: str, transcript: str) -> str:
+    """
+    Hash the extraction variant together with the transcript, after normalizing
+    away the transcript's casing, punctuation and whitespace.
+    """
+    normalized = " ".join(_WORD_RE.findall(transcript.lower()))
+    return hashlib.sha256(f"{variant}|{normalized}".encode()).hexdigest()
+
+
+def get(transcript: str, variant: str) -> BaseModel | None:
+    """
+    Look up a cached extraction result.
+
+    Args:
+        transcript: Video transcript, used for the exact and near-duplicate lookups
+        variant: Identifies the provider, model and prompt used for extraction
+
+    Returns:
+        Cached LLM extraction result, or None on miss
+    """
+    result = _exact.get(exact_key(variant, transcript))
+    if result is None:
+        result = _by_fingerprint.get(transcript_fingerprint(variant, transcript))
+    return result
+
+
+def put(transcript: str, variant: str, result: BaseModel) -> None:
+    """
+    Store an extraction result for a video.
+
+    Args:
+        transcript: Video transcript
+        variant: Identifies the provider, model and prompt used for extraction
+        result: LLM extraction result to cache
+    """
+    _exact.set(exact_key(variant, transcript), result)
+    _by_fingerprint.set(transcript_fingerprint(variant, transcript), result)
+
+
+async def get_or_compute(
+    transcript: str, variant: str, compute: Callable[[], Awaitable[T]]
+) -> tuple[T, bool]:
+    """
+    Look up a cached extraction result, computing and caching it on miss.
+
+    If the same request is already being computed, this waits for that result
+    instead of starting another computation. The computation carries on if the
+    caller that started it is cancelled. Failures are not cached.
+
+    Args:
+        transcript: Video transcript
+        variant: Identifies the provider, model and prompt used for extraction
+        compute: Called on miss to produce the extraction result
+
+    Returns:
+        Tuple of (extraction result, whether it was served without computing)
+    """
+    result = get(transcript, variant)
+    if result is not None:
+        return result, True
+
+    key = exact_key(variant, transcript)
+    inflight = _inflight.get(key)
+    if inflight is not None:
+        return await asyncio.shield(inflight), True
+
+    # The computation runs in its own task, which every caller (including the one
+    # that started it) awaits through a shield. Cancelling one request then only
+    # stops that request from waiting; the others still get the result.
+    task = asyncio.create_task(_compute_and_store(transcript, variant, compute))
+    _inflight[key] = task
+    task.add_done_callback(lambda done: _finish_inflight(key, done))
+    return await asyncio.shield(task), False
+
+
+async def _compute_and_store(
+    transcript: str, variant: str, compute: Callable[[], Awaitable[T]]
+) -> T:
+    """Compute an extraction result and cache it on success."""
+    result = await compute()
+    put(transcript, variant, result)
+    return result
+
+
+def _finish_inflight(key: str, task: asyncio.Task) -> None:
+    """Forget a finished in-flight computation."""
+    del _inflight[key]
+    # Mark any exception retrieved, so it isn't reported if every caller was cancelled
+    if not task.cancelled():
+        task.exception()
+
+
+def clear() -> None:
+    """Remove all cached extraction results."""
+    _exact.clear()
+    _by_fingerprint.clear()
@@ -0,0 +1,61 @@
+"""Shared HTTP client for outbound API traffic."""
+
+from collections.abc import Callable
+
+import httpx
+
+from app.config import settings
+
+_client: httpx.AsyncClient | None = None
+
+# Called when the shared client is closed, so holders of SDK clients built on it
+# (cached LLM clients, Clerk) drop them and rebuild on the next client
+_close_callbacks: list[Callable[[], None]] = []
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Get the process-wide pooled async HTTP client, creating it on first use.
+
+    Sharing one client lets outbound calls (Clerk, OpenAI) reuse keep-alive
+    connections instead of paying a TCP and TLS handshake per call.
+
+    Returns:
+        Shared httpx.AsyncClient
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            # The OpenAI SDK adopts this as its request timeout, so leave room for
+            # slow completions (matches the Anthropic client's 60s)
+            timeout=httpx.Timeout(60.0, connect=5.0),
+            limits=httpx.Limits(
+                max_keepalive_connections=settings.http_max_keepalive_connections,
+                max_connections=settings.http_max_connections,
+            ),
+        )
+    return _client
+
+
+def on_http_client_closed(callback: Callable[[], None]) -> None:
+    """
+    Register a callback to run whenever the shared HTTP client is closed.
+
+    Anything that keeps a reference to the shared client (e.g. a cached SDK
+    client) registers here to discard it, so the next use builds against the
+    fresh client rather than the closed one.
+
+    Args:
+        callback: Zero-argument callable, e.g. an lru_cache's cache_clear
+    """
+    _close_callbacks.append(callback)
+
+
+async def close_http_client() -> None:
+    """Close the shared HTTP client and its pooled connections."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+        for callback in _close_callbacks:
+            callback()
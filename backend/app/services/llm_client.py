@@ -1,13 +1,37 @@
 """Unified LLM client supporting OpenAI and Anthropic via LangChain."""
 
-from typing import Literal
-
+import asyncio
+import hashlib
+import threading
+import weakref
+from collections import Counter
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import Literal, TypeVar
+
+import orjson
 from langchain_anthropic import ChatAnthropic
 from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
+from langchain_core.runnables import Runnable
+from langchain_core.tools import BaseTool
+from langchain_core.utils.function_calling import convert_to_openai_function
 from langchain_openai import ChatOpenAI
+from pydantic import BaseModel, ValidationError
+from tenacity import (
+    AsyncRetrying,
+    RetryCallState,
+    retry_if_exception,
+    retry_if_exception_type,
+    stop_after_attempt,
+    wait_random_exponential,
+)
 
 from app.config import settings
 from app.observability.langfuse_client import observe
+from app.services.http_client import get_http_client, on_http_client_closed
+from app.utils.cache import TTLCache
 from app.utils.errors import LLMProviderError
 from app.utils.logger import setup_logger
 
@@ -15,7 +39,125 @@ logger = setup_logger(__name__)
 
 LLMProvider = Literal["openai", "anthropic"]
 
+# Marks the end of a sync-fallback stream on its hand-off queue
+_STREAM_END = object()
+
+T = TypeVar("T")
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
 CLAUDE_MODEL_NAME = "claude-3-5-haiku-latest"
+OPENAI_MODEL_NAME = "gpt-4o"
+
+# LangChain message class for each role in role/content message dicts
+_ROLE_TO_MSG: dict[str, type[BaseMessage]] = {
+    "system": SystemMessage,
+    "user": HumanMessage,
+    "assistant": AIMessage,
+}
+
+# Attempts for JSON-schema calls whose reply fails to parse or validate
+JSON_SCHEMA_MAX_ATTEMPTS = 3
+
+# Outbound concurrency limits, shared by every client in the process so bursts
+# of parallel ingest/chat work queue locally instead of tripping provider 429s
+_PROVIDER_LIMITS: dict[str, int] = {
+    "openai": settings.openai_concurrency,
+    "anthropic": settings.anthropic_concurrency,
+}
+# Semaphores bind to the event loop they're first used on, so each running loop
+# (e.g. per test, or after an app restart) gets its own set, created on demand
+_PROVIDER_SEMAPHORES: weakref.WeakKeyDictionary[
+    asyncio.AbstractEventLoop, dict[str, asyncio.Semaphore]
+] = weakref.WeakKeyDictionary()
+_PROVIDER_METRICS: dict[str, Counter] = {provider: Counter() for provider in _PROVIDER_LIMITS}
+
+# Retry policy for rate-limited (429) calls: jittered exponential backoff
+RATE_LIMIT_MAX_ATTEMPTS = 5
+_RATE_LIMIT_WAIT = wait_random_exponential(multiplier=1, max=30)
+
+
+# Replies to identical requests (e.g. a user re-asking the same question) are
+# served from memory instead of going back to the provider
+_response_cache: TTLCache[str, object] = TTLCache(
+    maxsize=settings.llm_response_cache_max_entries,
+    ttl_seconds=settings.llm_response_cache_ttl_seconds,
+)
+
+
+def _is_rate_limited(e: BaseException) -> bool:
+    """Whether an OpenAI/Anthropic SDK error is a 429 rate-limit response."""
+    return getattr(e, "status_code", None) == 429
+
+
+def _provider_semaphore(provider: str) -> asyncio.Semaphore:
+    """Get a provider's concurrency semaphore for the running event loop."""
+    loop = asyncio.get_running_loop()
+    semaphores = _PROVIDER_SEMAPHORES.get(loop)
+    if semaphores is None:
+        semaphores = _PROVIDER_SEMAPHORES[loop] = {
+            name: asyncio.Semaphore(limit) for name, limit in _PROVIDER_LIMITS.items()
+        }
+    return semaphores[provider]
+
+
+def get_provider_metrics() -> dict[str, dict[str, int]]:
+    """
+    Snapshot outbound LLM call counters per provider.
+
+    Returns:
+        Mapping of provider to its concurrency limit, calls in flight, total calls
+        and rate-limited responses
+    """
+    return {
+        provider: {
+            "limit": limit,
+            "in_flight": _PROVIDER_METRICS[provider]["in_flight"],
+            "calls": _PROVIDER_METRICS[provider]["calls"],
+            "rate_limited": _PROVIDER_METRICS[provider]["rate_limited"],
+        }
+        for provider, limit in _PROVIDER_LIMITS.items()
+    }
+
+
+def _strict_json_schema(schema: dict | list) -> dict | list:
+    """
+    Adapt a JSON schema to OpenAI's strict structured-output rules.
+
+    Strict mode requires every property to be listed as required (optional fields
+    stay nullable through their anyOf type), forbids additional properties and
+    does not accept defaults.
+    """
+    if isinstance(schema, list):
+        return [_strict_json_schema(item) for item in schema]
+    if not isinstance(schema, dict):
+        return schema
+
+    strict = {
+        key: value if key == "properties" else _strict_json_schema(value)
+        for key, value in schema.items()
+        if key != "default"
+    }
+    if "properties" in strict:
+        strict["properties"] = {
+            name: _strict_json_schema(prop) for name, prop in strict["properties"].items()
+        }
+        strict["required"] = list(strict["properties"])
+        strict["additionalProperties"] = False
+    return strict
+
+
+@lru_cache(maxsize=32)
+def json_schema_response_format(schema: type[BaseModel]) -> dict:
+    """Build (once per schema) the OpenAI `response_format` for a Pydantic model."""
+    function = convert_to_openai_function(schema, strict=True)
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": function["name"],
+            "schema": _strict_json_schema(function["parameters"]),
+            "strict": True,
+        },
+    }
 
 
 class LLMClient:
@@ -33,6 +175,14 @@ class LLMClient:
         """
         self.provider = provider
         self._model = self._initialize_model()
+        # Some provider SDK/version combinations have async paths far slower than
+        # their sync ones; for those, calls run the sync path in a worker thread
+        self._use_sync_fallback = provider in settings.llm_sync_fallback_providers
+        # Tool-bound models keyed by tool names; binding only captures the tool
+        # schemas, so a model bound for one session's tools serves every session
+        self._bound_cache: dict[tuple[str, ...], Runnable] = {}
+        # Structured-output runnables per schema, so the schema is converted once
+        self._structured_cache: dict[type, Runnable] = {}
 
     def _initialize_model(self) -> BaseChatModel:
         """
@@ -49,9 +199,10 @@ class LLMClient:
                 if not settings.openai_api_key:
                     raise LLMProviderError("OpenAI API key not configured")
 
-                logger.info("Initializing OpenAI model (gpt-4)")
+                logger.info("Initializing OpenAI model (%s)", OPENAI_MODEL_NAME)
                 return ChatOpenAI(
-                    model="gpt-4",
+                    model=OPENAI_MODEL_NAME,
+                    http_async_client=get_http_client(),
                     temperature=0.7,
                     api_key=settings.openai_api_key,
                 )
@@ -60,7 +211,7 @@ class LLMClient:
                 if not settings.anthropic_api_key:
                     raise LLMProviderError("Anthropic API key not configured")
 
-                logger.info(f"Initializing Anthropic model ({CLAUDE_MODEL_NAME})")
+                logger.info("Initializing Anthropic model (%s)", CLAUDE_MODEL_NAME)
                 return ChatAnthropic(
                     model=CLAUDE_MODEL_NAME,
                     temperature=0.1,
@@ -76,6 +227,223 @@ class LLMClient:
             logger.error(error_msg)
             raise LLMProviderError(error_msg) from e
 
+    def bind_tools(self, tools: list[BaseTool]) -> Runnable:
+        """
+        Get the model bound to the given tools, reusing a previous binding.
+
+        Args:
+            tools: Tools the model may call
+
+        Returns:
+            Tool-bound model runnable
+        """
+        key = tuple(sorted(t.name for t in tools))
+        bound = self._bound_cache.get(key)
+        if bound is None:
+            bound = self._bound_cache[key] = self._model.bind_tools(tools)
+        return bound
+
+    async def ainvoke(self, runnable: Runnable, messages: list) -> object:
+        """
+        Invoke a runnable built on this client's model.
+
+        Uses the runnable's async path, or its sync path in a worker thread when
+        the provider is configured for the sync fallback.
+
+        Args:
+            runnable: The model, or a runnable derived from it (tool-bound or
+                structured-output)
+            messages: LangChain messages
+
+        Returns:
+            The runnable's output
+        """
+        if self._use_sync_fallback:
+            return await asyncio.to_thread(runnable.invoke, messages)
+        return await runnable.ainvoke(messages)
+
+    async def astream(self, runnable: Runnable, messages: list, **kwargs) -> AsyncIterator:
+        """
+        Stream a runnable built on this client's model.
+
+        Uses the runnable's async stream, or, when the provider is configured for
+        the sync fallback, its sync stream in a worker thread whose chunks are
+        handed back to the event loop as they arrive.
+
+        Args:
+            runnable: The model, or a runnable derived from it (e.g. tool-bound)
+            messages: LangChain messages
+            **kwargs: Extra arguments for the model call (e.g. response_format)
+
+        Yields:
+            Chunks from the stream
+        """
+        if not self._use_sync_fallback:
+            async for chunk in runnable.astream(messages, **kwargs):
+                yield chunk
+            return
+
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue[tuple[object, BaseException | None]] = asyncio.Queue()
+        stop = threading.Event()
+
+        def produce() -> None:
+            error = None
+            try:
+                for chunk in runnable.stream(messages, **kwargs):
+                    # The consumer went away; stop pulling from the provider
+                    if stop.is_set():
+                        return
+                    loop.call_soon_threadsafe(queue.put_nowait, (chunk, None))
+            except Exception as e:
+                error = e
+            loop.call_soon_threadsafe(queue.put_nowait, (_STREAM_END, error))
+
+        producer = asyncio.create_task(asyncio.to_thread(produce))
+        try:
+            while True:
+                chunk, error = await queue.get()
+                if chunk is _STREAM_END:
+                    if error is not None:
+                        raise error
+                    break
+                yield chunk
+            await producer
+        finally:
+            stop.set()
+
+    @asynccontextmanager
+    async def concurrency_slot(self) -> AsyncIterator[None]:
+        """
+        Hold one of the provider's outbound call slots for the duration of the block.
+
+        Used directly by callers that drive the model themselves, such as streaming
+        chat; other calls go through `run_limited`.
+        """
+        metrics = _PROVIDER_METRICS[self.provider]
+        async with _provider_semaphore(self.provider):
+            metrics["calls"] += 1
+            metrics["in_flight"] += 1
+            try:
+                yield
+            finally:
+                metrics["in_flight"] -= 1
+
+    async def run_limited(self, make_call: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run a provider call within the concurrency limit, retrying rate-limit errors.
+
+        Args:
+            make_call: Zero-argument callable returning the awaitable to run (called
+                again for each retry)
+
+        Returns:
+            Result of the call
+        """
+        async for attempt in AsyncRetrying(
+            retry=retry_if_exception(_is_rate_limited),
+            wait=_RATE_LIMIT_WAIT,
+            stop=stop_after_attempt(RATE_LIMIT_MAX_ATTEMPTS),
+            before_sleep=self._record_rate_limit,
+            reraise=True,
+        ):
+            with attempt:
+                async with self.concurrency_slot():
+                    result = await make_call()
+        return result
+
+    async def stream_limited(
+        self, make_stream: Callable[[], AsyncIterator[T]]
+    ) -> AsyncIterator[T]:
+        """
+        Stream a provider call within the concurrency limit, retrying rate-limit errors.
+
+        A rate-limit error is only retried if nothing has been yielded yet; once
+        chunks have reached the caller, errors propagate.
+
+        Args:
+            make_stream: Zero-argument callable returning the async iterator to
+                consume (called again for each retry)
+
+        Yields:
+            Chunks from the stream
+        """
+        started = False
+        async for attempt in AsyncRetrying(
+            retry=retry_if_exception(lambda e: not started and _is_rate_limited(e)),
+            wait=_RATE_LIMIT_WAIT,
+            stop=stop_after_attempt(RATE_LIMIT_MAX_ATTEMPTS),
+            before_sleep=self._record_rate_limit,
+            reraise=True,
+        ):
+            with attempt:
+                async with self.concurrency_slot():
+                    async for chunk in make_stream():
+                        started = True
+                        yield chunk
+
+    def _record_rate_limit(self, retry_state: RetryCallState) -> None:
+        """Count a rate-limited call before backing off."""
+        _PROVIDER_METRICS[self.provider]["rate_limited"] += 1
+        logger.warning(
+            "%s rate limited, retrying (attempt %d)", self.provider, retry_state.attempt_number
+        )
+
+    def _response_cache_key(
+        self, kind: str, messages: list[dict], schema: type | None = None
+    ) -> str:
+        """Hash a request into a response-cache key."""
+        payload = [
+            kind,
+            self.provider,
+            self.get_model_name(),
+            f"{schema.__module__}.{schema.__qualname__}" if schema else None,
+            messages,
+        ]
+        return hashlib.sha256(orjson.dumps(payload)).hexdigest()
+
+    @staticmethod
+    def _cached_response(key: str) -> object | None:
+        """Look up a cached reply, copying models so callers can't mutate the cached one."""
+        cached = _response_cache.get(key)
+        if isinstance(cached, BaseModel):
+            return cached.model_copy(deep=True)
+        return cached
+
+    @staticmethod
+    def _store_response(key: str, value: object) -> None:
+        """Cache a reply, keeping a private copy of models."""
+        if isinstance(value, BaseModel):
+            value = value.model_copy(deep=True)
+        _response_cache.set(key, value)
+
+    def _to_langchain_messages(self, messages: list[dict]) -> list[BaseMessage]:
+        """
+        Convert role/content message dicts to LangChain messages.
+
+        System messages are marked as a prompt-cache breakpoint for Anthropic so the
+        stable system prefix can be reused across calls. OpenAI caches matching
+        prefixes automatically, which only requires the system message to come first.
+
+        Args:
+            messages: List of message dictionaries with 'role' and 'content'
+
+        Returns:
+            List of LangChain message objects
+        """
+        langchain_messages = []
+        for msg in messages:
+            message_cls = _ROLE_TO_MSG.get(msg["role"])
+            if message_cls is None:
+                continue
+            content = msg["content"]
+            if message_cls is SystemMessage and self.provider == "anthropic":
+                content = [
+                    {"type": "text", "text": content, "cache_control": {"type": "ephemeral"}}
+                ]
+            langchain_messages.append(message_cls(content=content))
+        return langchain_messages
+
     @observe(as_type="generation")
     async def invoke(self, messages: list[dict]) -> str:
         """
@@ -90,27 +458,21 @@ class LLMClient:
         Raises:
             LLMProviderError: If invocation fails
         """
+        cache_key = self._response_cache_key("invoke", messages)
+        cached = self._cached_response(cache_key)
+        if cached is not None:
+            logger.info("LLM response cache hit (%s)", self.provider)
+            return cached
+
         try:
             # Convert messages to LangChain format
-            langchain_messages = []
-            for msg in messages:
-                if msg["role"] == "system":
-                    from langchain_core.messages import SystemMessage
-
-                    langchain_messages.append(SystemMessage(content=msg["content"]))
-                elif msg["role"] == "user":
-                    from langchain_core.messages import HumanMessage
-
-                    langchain_messages.append(HumanMessage(content=msg["content"]))
-                elif msg["role"] == "assistant":
-                    from langchain_core.messages import AIMessage
-
-                    langchain_messages.append(AIMessage(content=msg["content"]))
+            langchain_messages = self._to_langchain_messages(messages)
 
             # Invoke the model
-            response = await self._model.ainvoke(langchain_messages)
+            response = await self.run_limited(lambda: self.ainvoke(self._model, langchain_messages))
 
-            logger.info(f"LLM invocation successful using {self.provider}")
+            logger.info("LLM invocation successful using %s", self.provider)
+            self._store_response(cache_key, response.content)
             return response.content
 
         except Exception as e:
@@ -119,7 +481,7 @@ class LLMClient:
             raise LLMProviderError(error_msg) from e
 
     @observe(as_type="generation")
-    async def invoke_structured(self, messages: list[dict], schema: type) -> object:
+    async def invoke_structured(self, messages: list[dict], schema: type[ModelT]) -> ModelT:
         """
         Invoke the LLM and parse response into structured format using Pydantic.
 
@@ -128,62 +490,131 @@ class LLMClient:
             schema: Pydantic model class for structured output
 
         Returns:
-            Parsed structured output of type `schema`
+            Parsed `schema` instance, used directly by callers (no dict round-trip)
 
         Raises:
             LLMProviderError: If invocation or parsing fails
         """
+        cache_key = self._response_cache_key("structured", messages, schema)
+        cached = self._cached_response(cache_key)
+        if cached is not None:
+            logger.info("Structured LLM response cache hit (%s)", self.provider)
+            return cached
+
         try:
-            # Use LangChain's structured output capability
-            structured_llm = self._model.with_structured_output(schema)
+            # Use LangChain's structured output capability (built once per schema).
+            # OpenAI gets native JSON-schema output rather than the function-calling path.
+            structured_llm = self._structured_cache.get(schema)
+            if structured_llm is None:
+                if self.provider == "openai":
+                    structured_llm = self._model.with_structured_output(
+                        schema, method="json_schema"
+                    )
+                else:
+                    structured_llm = self._model.with_structured_output(schema)
+                self._structured_cache[schema] = structured_llm
 
             # Convert messages
-            langchain_messages = []
-            for msg in messages:
-                if msg["role"] == "system":
-                    from langchain_core.messages import SystemMessage
+            langchain_messages = self._to_langchain_messages(messages)
 
-                    langchain_messages.append(SystemMessage(content=msg["content"]))
-                elif msg["role"] == "user":
-                    from langchain_core.messages import HumanMessage
+            # Invoke with structured output
+            result = await self.run_limited(
+                lambda: self.ainvoke(structured_llm, langchain_messages)
+            )
+
+            logger.info("Structured LLM invocation successful using %s", self.provider)
+            # Only a size summary: the result itself can hold dozens of places
+            logger.debug(
+                "Structured result type=%s size=%d",
+                type(result).__name__,
+                len(getattr(result, "places", ())),
+            )
+
+            self._store_response(cache_key, result)
+            return result
 
-                    langchain_messages.append(HumanMessage(content=msg["content"]))
+        except Exception as e:
+            error_msg = f"Structured LLM invocation failed ({self.provider}): {str(e)}"
+            logger.error(error_msg)
+            raise LLMProviderError(error_msg) from e
 
-            # Invoke with structured output
-            result = await structured_llm.ainvoke(langchain_messages)
+    @observe(as_type="generation")
+    async def invoke_json_schema(self, messages: list[dict], schema: type[ModelT]) -> ModelT:
+        """
+        Invoke an OpenAI model with a strict JSON-schema response format.
 
-            logger.info(f"Structured LLM invocation successful using {self.provider}")
+        Cheaper than tool-call based structured output: the reply is streamed back
+        as plain JSON text, parsed once complete and validated against `schema`.
+        Replies that fail to parse or validate are retried.
 
-            logger.info("Structured LLM invocation result of type: %s", type(result))
-            logger.info("Structured LLM invocation result: %s", result)
+        Args:
+            messages: List of message dictionaries
+            schema: Pydantic model class for structured output
+
+        Returns:
+            Parsed structured output of type `schema`
 
+        Raises:
+            LLMProviderError: If the provider is not OpenAI, or invocation or parsing fails
+        """
+        if self.provider != "openai":
+            raise LLMProviderError(f"JSON-schema responses are not supported for {self.provider}")
+
+        cache_key = self._response_cache_key("json_schema", messages, schema)
+        cached = self._cached_response(cache_key)
+        if cached is not None:
+            logger.info("JSON-schema LLM response cache hit (%s)", self.provider)
+            return cached
+
+        try:
+            response_format = json_schema_response_format(schema)
+            langchain_messages = self._to_langchain_messages(messages)
+
+            async for attempt in AsyncRetrying(
+                stop=stop_after_attempt(JSON_SCHEMA_MAX_ATTEMPTS),
+                retry=retry_if_exception_type((orjson.JSONDecodeError, ValidationError)),
+                reraise=True,
+            ):
+                with attempt:
+                    text = await self.run_limited(
+                        lambda: self._stream_text(
+                            langchain_messages, response_format=response_format
+                        )
+                    )
+                    result = schema.model_validate(orjson.loads(text))
+
+            logger.info("JSON-schema LLM invocation successful using %s", self.provider)
+            self._store_response(cache_key, result)
             return result
-            # # Convert Pydantic model to dict
-            # if hasattr(result, "model_dump"):
-            #     return result.model_dump()
-            # elif hasattr(result, "dict"):
-            #     return result.dict()
-            # else:
-            #     return dict(result)
 
         except Exception as e:
-            error_msg = f"Structured LLM invocation failed ({self.provider}): {str(e)}"
+            error_msg = f"JSON-schema LLM invocation failed ({self.provider}): {str(e)}"
             logger.error(error_msg)
             raise LLMProviderError(error_msg) from e
 
+    async def _stream_text(self, langchain_messages: list, **kwargs) -> str:
+        """Stream a completion and return its concatenated text content."""
+        stream = self.astream(self._model, langchain_messages, **kwargs)
+        parts = [chunk.content async for chunk in stream]
+        return "".join(parts)
+
     def get_model_name(self) -> str:
         """Get the name of the current model."""
         if self.provider == "openai":
-            return "gpt-4"
+            return OPENAI_MODEL_NAME
         elif self.provider == "anthropic":
             return CLAUDE_MODEL_NAME
         return "unknown"
 
 
+@lru_cache(maxsize=None)
 def create_llm_client(provider: LLMProvider) -> LLMClient:
     """
     Factory function to create an LLM client.
 
+    Clients are created once per provider and shared across requests, so the
+    underlying model and SDK clients (and their connection pools) are reused.
+
     Args:
         provider: LLM provider name
 
@@ -194,3 +625,7 @@ def create_llm_client(provider: LLMProvider) -> LLMClient:
         LLMProviderError: If client creation fails
     """
     return LLMClient(provider)
+
+
+# Cached clients hold the shared HTTP client, so rebuild them once it's closed
+on_http_client_closed(create_llm_client.cache_clear)
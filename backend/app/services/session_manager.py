@@ -1,17 +1,66 @@
 """In-memory session management with TTL."""
 
 import asyncio
-from datetime import datetime, timedelta
-from typing import Optional
+import heapq
+import threading
+import time
+from typing import NamedTuple, Optional
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
 
 from app.config import settings
+from app.models._defaults import utc_now
+from app.models.chat import ChatMessage
+from app.models.place import Place, PlaceType
 from app.models.session import Session
+from app.models.video import Video
 from app.utils.errors import InvalidSessionError
 from app.utils.logger import setup_logger
+from app.utils.tokens import count_tokens
 
 logger = setup_logger(__name__)
 
 
+class SessionIndex(NamedTuple):
+    """Lookup tables over a session's places and videos."""
+
+    places_by_id: dict[str, Place]
+    videos_by_id: dict[str, Video]
+    # First place ID for each (name, video_id), used to resolve tool results
+    place_ids_by_key: dict[tuple[str, str], str]
+    # (place, lowercased search text) pairs, in session order and grouped by type,
+    # for the chat search tool
+    search_entries: list[tuple[Place, str]]
+    search_entries_by_type: dict[PlaceType, list[tuple[Place, str]]]
+
+
+def _search_text(place: Place) -> str:
+    """
+    Lowercased searchable text for a place.
+
+    The NUL separator keeps a query from matching across field boundaries.
+    """
+    return f"{place.name}\x00{place.description}\x00{place.mentioned_context}".lower()
+
+
+class _IndexEntry(NamedTuple):
+    """A session index and the lists (and lengths) it was built from."""
+
+    index: SessionIndex
+    places: list[Place]
+    places_count: int
+    videos: list[Video]
+    videos_count: int
+
+
+class _HistoryEntry(NamedTuple):
+    """A session's converted chat history, per-message token counts and source list."""
+
+    chat_history: list[ChatMessage]
+    messages: list[BaseMessage]
+    token_counts: list[int]
+
+
 class SessionManager:
     """Manages user sessions in memory with TTL."""
 
@@ -20,6 +69,35 @@ class SessionManager:
         self._sessions: dict[str, Session] = {}
         self._cleanup_task: Optional[asyncio.Task] = None
 
+        # Chat tools read indexes and transcripts from worker threads while request
+        # handlers and the cleanup task mutate state on the event loop. Every
+        # operation is short and never awaits, so a re-entrant thread lock (rather
+        # than an asyncio.Lock, which would force all callers to become async)
+        # keeps them consistent.
+        self._lock = threading.RLock()
+
+        # Monotonic expiry time per session, plus a min-heap of (expiry, session ID)
+        # so cleanup only visits sessions that are due. Refreshing a session pushes a
+        # new heap entry; entries that no longer match _expires_at are skipped.
+        self._expires_at: dict[str, float] = {}
+        self._expiry_heap: list[tuple[float, str]] = []
+
+        # Lookup indexes per session, extended as places and videos are appended so
+        # chat turns and ingests never rebuild them from scratch
+        self._indexes: dict[str, _IndexEntry] = {}
+
+        # Chat history converted to LangChain messages per session, keyed to the
+        # history list it was built from and extended as turns are appended
+        self._histories: dict[str, _HistoryEntry] = {}
+
+        # Transcripts are large and only needed on demand (e.g. by the chat
+        # transcript tool), so they're kept out of Session objects, keyed by video ID.
+        # Each is held for as long as any live session references it: sessions
+        # sharing a video share one copy, released when the last of them is dropped.
+        self._transcripts: dict[str, str] = {}
+        self._transcript_sessions: dict[str, set[str]] = {}
+        self._session_transcripts: dict[str, set[str]] = {}
+
     async def start(self):
         """Start background cleanup task."""
         if self._cleanup_task is None:
@@ -43,25 +121,41 @@ class SessionManager:
             try:
                 await asyncio.sleep(300)  # Run every 5 minutes
 
-                now = datetime.utcnow()
-                ttl_delta = timedelta(seconds=settings.session_ttl_seconds)
-                expired_ids = []
-
-                for session_id, session in self._sessions.items():
-                    if now - session.last_activity > ttl_delta:
-                        expired_ids.append(session_id)
-
-                for session_id in expired_ids:
-                    del self._sessions[session_id]
-                    logger.info(f"Cleaned up expired session: {session_id}")
-
-                if expired_ids:
-                    logger.info(f"Cleaned up {len(expired_ids)} expired sessions")
+                expired = self._sweep_expired()
+                if expired:
+                    logger.info("Cleaned up %d expired sessions", expired)
 
             except asyncio.CancelledError:
                 break
             except Exception as e:
-                logger.error(f"Error in session cleanup task: {str(e)}")
+                logger.error("Error in session cleanup task: %s", e)
+
+    def _sweep_expired(self) -> int:
+        """
+        Drop every session whose TTL has elapsed.
+
+        Returns:
+            Number of sessions dropped
+        """
+        with self._lock:
+            now = time.monotonic()
+            expired = 0
+            while self._expiry_heap and self._expiry_heap[0][0] <= now:
+                expires_at, session_id = heapq.heappop(self._expiry_heap)
+                # Stale entry: the session was refreshed or already removed
+                if self._expires_at.get(session_id) != expires_at:
+                    continue
+                self._drop_session(session_id)
+                logger.info("Cleaned up expired session: %s", session_id)
+                expired += 1
+            return expired
+
+    def _touch(self, session: Session) -> None:
+        """Refresh a session's activity timestamp and push back its expiry."""
+        session.last_activity = utc_now()
+        expires_at = time.monotonic() + settings.session_ttl_seconds
+        self._expires_at[session.session_id] = expires_at
+        heapq.heappush(self._expiry_heap, (expires_at, session.session_id))
 
     def create_session(self) -> Session:
         """
@@ -70,10 +164,12 @@ class SessionManager:
         Returns:
             New Session object
         """
-        session = Session()
-        self._sessions[session.session_id] = session
-        logger.info(f"Created new session: {session.session_id}")
-        return session
+        with self._lock:
+            session = Session()
+            self._sessions[session.session_id] = session
+            self._touch(session)
+            logger.info("Created new session: %s", session.session_id)
+            return session
 
     def get_session(self, session_id: str) -> Session:
         """
@@ -88,20 +184,18 @@ class SessionManager:
         Raises:
             InvalidSessionError: If session doesn't exist or is expired
         """
-        session = self._sessions.get(session_id)
+        with self._lock:
+            session = self._sessions.get(session_id)
 
-        if not session:
-            raise InvalidSessionError(f"Session not found: {session_id}")
+            if not session:
+                raise InvalidSessionError(f"Session not found: {session_id}")
 
-        # Check if expired
-        now = datetime.utcnow()
-        ttl_delta = timedelta(seconds=settings.session_ttl_seconds)
+            # Check if expired
+            if self._expires_at[session_id] <= time.monotonic():
+                self._drop_session(session_id)
+                raise InvalidSessionError(f"Session expired: {session_id}")
 
-        if now - session.last_activity > ttl_delta:
-            del self._sessions[session_id]
-            raise InvalidSessionError(f"Session expired: {session_id}")
-
-        return session
+            return session
 
     def get_or_create_session(self, session_id: Optional[str]) -> Session:
         """
@@ -113,12 +207,13 @@ class SessionManager:
         Returns:
             Session object
         """
-        if not session_id:
-            return self.create_session()
-        session = self._sessions.get(session_id, None)
-        if not session:
-            return self.create_session()
-        return session
+        with self._lock:
+            if not session_id:
+                return self.create_session()
+            session = self._sessions.get(session_id, None)
+            if not session:
+                return self.create_session()
+            return session
 
     def update_session(self, session: Session) -> None:
         """
@@ -127,9 +222,10 @@ class SessionManager:
         Args:
             session: Session to update
         """
-        session.last_activity = datetime.utcnow()
-        self._sessions[session.session_id] = session
-        logger.debug(f"Updated session: {session.session_id}")
+        with self._lock:
+            self._sessions[session.session_id] = session
+            self._touch(session)
+            logger.debug("Updated session: %s", session.session_id)
 
     def delete_session(self, session_id: str) -> None:
         """
@@ -141,11 +237,172 @@ class SessionManager:
         Raises:
             InvalidSessionError: If session doesn't exist
         """
-        if session_id not in self._sessions:
-            raise InvalidSessionError(f"Session not found: {session_id}")
+        with self._lock:
+            if self._drop_session(session_id) is None:
+                raise InvalidSessionError(f"Session not found: {session_id}")
 
-        del self._sessions[session_id]
-        logger.info(f"Deleted session: {session_id}")
+            logger.info("Deleted session: %s", session_id)
+
+    def _drop_session(self, session_id: str) -> Optional[Session]:
+        """
+        Remove a session and its expiry, cached lookup index and history.
+
+        Transcripts the session stored are released once no other session
+        references them.
+
+        Returns:
+            The removed session, or None if it didn't exist
+        """
+        session = self._sessions.pop(session_id, None)
+        self._expires_at.pop(session_id, None)
+        self._indexes.pop(session_id, None)
+        self._histories.pop(session_id, None)
+
+        for video_id in self._session_transcripts.pop(session_id, ()):
+            sessions = self._transcript_sessions[video_id]
+            sessions.discard(session_id)
+            if not sessions:
+                del self._transcript_sessions[video_id]
+                del self._transcripts[video_id]
+        return session
+
+    def get_index(self, session: Session) -> SessionIndex:
+        """
+        Get lookup tables for a session's places and videos.
+
+        Places and videos are append-only, so the cached index is extended with
+        any items appended since the last call. It is rebuilt only if either list
+        was replaced or has shrunk.
+
+        Args:
+            session: Session to index
+
+        Returns:
+            SessionIndex with places keyed by place ID and by (name, video ID),
+            videos keyed by video ID, and place search text by type
+        """
+        with self._lock:
+            places, videos = session.places, session.videos
+            entry = self._indexes.get(session.session_id)
+            if (
+                entry is not None
+                and entry.places is places
+                and entry.videos is videos
+                and len(places) >= entry.places_count
+                and len(videos) >= entry.videos_count
+            ):
+                if len(places) == entry.places_count and len(videos) == entry.videos_count:
+                    return entry.index
+                index = entry.index
+                new_places = places[entry.places_count :]
+                index.videos_by_id.update((v.video_id, v) for v in videos[entry.videos_count :])
+            else:
+                index = SessionIndex(
+                    places_by_id={},
+                    videos_by_id={v.video_id: v for v in videos},
+                    place_ids_by_key={},
+                    search_entries=[],
+                    search_entries_by_type={},
+                )
+                new_places = places
+
+            for place in new_places:
+                index.places_by_id[place.id] = place
+                index.place_ids_by_key.setdefault((place.name, place.video_id), place.id)
+                search_entry = (place, _search_text(place))
+                index.search_entries.append(search_entry)
+                index.search_entries_by_type.setdefault(place.type, []).append(search_entry)
+
+            self._indexes[session.session_id] = _IndexEntry(
+                index, places, len(places), videos, len(videos)
+            )
+            return index
+
+    def get_history_messages(
+        self, session: Session, max_tokens: int | None = None
+    ) -> list[BaseMessage]:
+        """
+        Get a session's chat history as LangChain messages.
+
+        Like the lookup index, the converted history and each message's token
+        count are cached, and only the turns appended since the last call are
+        converted and counted.
+
+        Args:
+            session: Session whose chat history to convert
+            max_tokens: If set, only the most recent messages whose combined
+                token count fits this budget are returned
+
+        Returns:
+            LangChain messages, oldest first
+        """
+        with self._lock:
+            history = session.chat_history
+            entry = self._histories.get(session.session_id)
+            if (
+                entry is None
+                or entry.chat_history is not history
+                or len(history) < len(entry.messages)
+            ):
+                entry = _HistoryEntry(history, [], [])
+                self._histories[session.session_id] = entry
+
+            for msg in history[len(entry.messages) :]:
+                message_cls = AIMessage if msg.role == "assistant" else HumanMessage
+                entry.messages.append(message_cls(content=msg.content))
+                entry.token_counts.append(count_tokens(msg.content))
+
+            if max_tokens is None:
+                return entry.messages
+
+            # Walk back from the newest message until the budget is spent
+            start, total = len(entry.messages), 0
+            while start > 0 and total + entry.token_counts[start - 1] <= max_tokens:
+                start -= 1
+                total += entry.token_counts[start]
+            return entry.messages[start:]
+
+    def store_transcript(self, session: Session, video_id: str, transcript: str) -> bool:
+        """
+        Store a video transcript outside of the session payload.
+
+        The transcript is kept until every session that stored it is dropped. If the
+        session has already been dropped (e.g. it expired mid-ingest), nothing is
+        stored, since nothing would ever release it.
+
+        Args:
+            session: Session referencing the video
+            video_id: YouTube video ID
+            transcript: Full transcript text
+
+        Returns:
+            Whether the transcript was stored
+        """
+        with self._lock:
+            if session.session_id not in self._sessions:
+                logger.debug(
+                    "Not storing transcript %s for dropped session %s",
+                    video_id,
+                    session.session_id,
+                )
+                return False
+            self._transcripts[video_id] = transcript
+            self._transcript_sessions.setdefault(video_id, set()).add(session.session_id)
+            self._session_transcripts.setdefault(session.session_id, set()).add(video_id)
+            return True
+
+    def get_transcript(self, video_id: str) -> str | None:
+        """
+        Retrieve a stored video transcript.
+
+        Args:
+            video_id: YouTube video ID
+
+        Returns:
+            Transcript text, or None if no live session references the video
+        """
+        with self._lock:
+            return self._transcripts.get(video_id)
 
     def get_session_count(self) -> int:
         """Get the number of active sessions."""
@@ -1,7 +1,10 @@
 """YouTube transcript and metadata fetching service."""
 
+import asyncio
 import re
-from urllib.parse import parse_qs, urlparse
+import string
+import threading
+from urllib.parse import parse_qsl, urlsplit
 
 from youtube_transcript_api import YouTubeTranscriptApi
 from youtube_transcript_api._errors import (
@@ -10,13 +13,79 @@ from youtube_transcript_api._errors import (
     VideoUnavailable,
 )
 
+from app.config import settings
 from app.models.video import Video
-from app.observability.langfuse_client import observe
+from app.observability.langfuse_client import langfuse_client, observe
+from app.utils.cache import TTLCache
 from app.utils.errors import YouTubeTranscriptError
 from app.utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
+# Accepted YouTube URL shapes, capturing the 11-character video ID
+_YOUTUBE_URL_RE = re.compile(
+    r"^(?:https?://)?(?:www\.|m\.)?"
+    r"(?:youtube\.com/(?:watch\?(?:[^#]*&)?v=|shorts/|embed/|v/)|youtu\.be/)"
+    r"([A-Za-z0-9_-]{11})(?:[?&#/].*)?$"
+)
+
+# Video ID forms extract_video_id looks for, fused into one alternation so each
+# URL is scanned once
+_YT_RE = re.compile(
+    r"(?:youtube\.com/watch\?v=|youtu\.be/|youtube\.com/embed/|youtube\.com/v/)([^&?/]+)"
+)
+
+# YouTube video IDs are always exactly this many base64url characters
+_VIDEO_ID_LEN = 11
+
+# Literal prefixes that directly precede the video ID in the common URL forms,
+# checked with str.find before falling back to _YT_RE
+_VIDEO_ID_PREFIXES = ("youtube.com/watch?v=", "youtu.be/", "youtube.com/embed/")
+_VIDEO_ID_CHARS = frozenset(string.ascii_letters + string.digits + "-_")
+# What may follow the ID for the fast path to apply (the same delimiters _YT_RE stops at)
+_VIDEO_ID_TERMINATORS = ("", "&", "?", "/")
+
+# YouTubeTranscriptApi wraps a requests.Session, which keeps connections to YouTube
+# alive between fetches but isn't thread-safe. Transcript fetches run in worker
+# threads, so each thread reuses its own client.
+_transcript_api_local = threading.local()
+
+
+def _transcript_api() -> YouTubeTranscriptApi:
+    """Get the calling thread's transcript API client, creating it on first use."""
+    api = getattr(_transcript_api_local, "api", None)
+    if api is None:
+        api = _transcript_api_local.api = YouTubeTranscriptApi()
+    return api
+
+
+# Processed videos by video ID, so re-ingesting a video skips the YouTube round trips
+_videos: TTLCache[str, Video] = TTLCache(
+    maxsize=settings.video_cache_max_entries,
+    ttl_seconds=settings.video_cache_ttl_seconds,
+)
+
+
+def canonicalize_video_url(url: str) -> str:
+    """
+    Validate a YouTube URL and normalize it to its canonical watch URL.
+
+    Runs before any network I/O, so malformed input is rejected cheaply.
+
+    Args:
+        url: YouTube URL
+
+    Returns:
+        Canonical URL of the form https://www.youtube.com/watch?v={video_id}
+
+    Raises:
+        ValueError: If the URL is not a recognized YouTube video URL
+    """
+    match = _YOUTUBE_URL_RE.match(url.strip())
+    if not match:
+        raise ValueError(f"Invalid YouTube URL: {url}")
+    return f"https://www.youtube.com/watch?v={match.group(1)}"
+
 
 def extract_video_id(url: str) -> str:
     """
@@ -34,26 +103,38 @@ def extract_video_id(url: str) -> str:
     # Remove whitespace
     url = url.strip()
 
-    # Regex patterns for different YouTube URL formats
-    patterns = [
-        r"(?:youtube\.com/watch\?v=|youtu\.be/|youtube\.com/embed/)([^&\?/]+)",
-        r"youtube\.com/v/([^&\?/]+)",
-    ]
-
-    for pattern in patterns:
-        match = re.search(pattern, url)
-        if match:
-            return match.group(1)
-
-    # Try parsing query parameters as fallback
-    try:
-        parsed_url = urlparse(url)
-        if "youtube.com" in parsed_url.netloc:
-            query_params = parse_qs(parsed_url.query)
-            if "v" in query_params:
-                return query_params["v"][0]
-    except Exception:
-        pass
+    # Fast path: slice the fixed-width ID straight after a known prefix
+    for prefix in _VIDEO_ID_PREFIXES:
+        start = url.find(prefix)
+        if start != -1:
+            start += len(prefix)
+            end_index = start + _VIDEO_ID_LEN
+            video_id = url[start:end_index]
+            end = url[end_index : end_index + 1]
+            if (
+                len(video_id) == _VIDEO_ID_LEN
+                and _VIDEO_ID_CHARS.issuperset(video_id)
+                and end in _VIDEO_ID_TERMINATORS
+            ):
+                return video_id
+            # Anything unusual after the prefix goes through the regex
+            break
+
+    # Candidates of the wrong length can't be real IDs; rejecting them here saves
+    # a failing transcript fetch
+    match = _YT_RE.search(url)
+    if match and len(match.group(1)) == _VIDEO_ID_LEN:
+        return match.group(1)
+
+    # Try parsing query parameters as fallback. urlsplit skips the legacy
+    # ;params parsing urlparse does, and only raises ValueError (e.g. a malformed
+    # IPv6 host), which matches this function's contract.
+    parsed_url = urlsplit(url)
+    if "youtube.com" in parsed_url.netloc:
+        # Only the first v= matters, so stop at it instead of building a dict
+        video_id = next((value for key, value in parse_qsl(parsed_url.query) if key == "v"), "")
+        if len(video_id) == _VIDEO_ID_LEN:
+            return video_id
 
     raise ValueError(f"Could not extract video ID from URL: {url}")
 
@@ -73,18 +154,25 @@ async def fetch_transcript(video_id: str) -> str:
         YouTubeTranscriptError: If transcript cannot be fetched
     """
     try:
-        # Try to get English transcript first, then fall back to any available
-        transcript_data = YouTubeTranscriptApi().fetch(video_id, languages=["en"])
+        # Try to get English transcript first, then fall back to any available.
+        # The client is blocking, so it runs in a worker thread to let concurrent
+        # fetches overlap instead of stalling the event loop.
+        transcript_data = await asyncio.to_thread(
+            lambda: _transcript_api().fetch(video_id, languages=["en"])
+        )
 
         # Combine all text segments
-        full_text = " ".join([entry.text for entry in transcript_data])
+        full_text = " ".join(entry.text for entry in transcript_data)
+        # str stores its length, so this is O(1); computed once for every consumer
+        transcript_length = len(full_text)
 
-        # span.set_attribute("transcript.length", len(full_text))
-        logger.info(
-            f"Fetched transcript for video {video_id}, length: {len(full_text)}"
-        )
+        # span.set_attribute("transcript.length", transcript_length)
+        logger.info("Fetched transcript for video %s, length: %d", video_id, transcript_length)
 
-        # lf.update_current_span(metadata={"transcript.length": len(full_text)})
+        # langfuse_client is None when credentials aren't configured (tests, local
+        # dev), in which case there's no span to annotate
+        if langfuse_client is not None:
+            langfuse_client.update_current_span(metadata={"transcript.length": transcript_length})
         return full_text
 
     except (NoTranscriptFound, TranscriptsDisabled) as e:
@@ -103,12 +191,14 @@ async def fetch_transcript(video_id: str) -> str:
         raise YouTubeTranscriptError(error_msg) from e
 
 
-async def fetch_video_metadata(video_id: str, url: str) -> dict:
+def fetch_video_metadata(video_id: str, url: str) -> dict:
     """
     Fetch video metadata (title, description, duration).
 
     Note: For MVP, we use placeholder values. In production, this would
-    call the YouTube Data API v3 to get actual metadata.
+    call the YouTube Data API v3 to get actual metadata. Building placeholders
+    involves no I/O, so this is a plain function for now; it becomes async again
+    once the API call is wired in.
 
     Args:
         video_id: YouTube video ID
@@ -133,6 +223,10 @@ async def process_video(url: str) -> Video:
     """
     Process a YouTube video: extract ID, fetch transcript and metadata.
 
+    Results are cached by video ID, so any URL form of a recently processed video
+    is served without calling YouTube. Callers get their own copy, which they may
+    modify freely.
+
     Args:
         url: YouTube URL
 
@@ -147,13 +241,18 @@ async def process_video(url: str) -> Video:
     video_id = extract_video_id(url)
     # span.set_attribute("video.id", video_id)
 
-    logger.info(f"Processing video: {video_id}")
+    cached = _videos.get(video_id)
+    if cached is not None:
+        logger.info("Video cache hit: %s", video_id)
+        return cached.model_copy(deep=True)
+
+    logger.info("Processing video: %s", video_id)
 
     # Fetch transcript
     transcript = await fetch_transcript(video_id)
 
     # Fetch metadata
-    metadata = await fetch_video_metadata(video_id, url)
+    metadata = fetch_video_metadata(video_id, url)
 
     # Create Video model
     video = Video(
@@ -165,5 +264,23 @@ async def process_video(url: str) -> Video:
         url=url,
     )
 
-    logger.info(f"Successfully processed video: {video_id}")
-    return video
+    _videos.set(video_id, video)
+    logger.info("Successfully processed video: %s", video_id)
+    return video.model_copy(deep=True)
+
+
+async def process_videos(urls: list[str]) -> list[Video | BaseException]:
+    """
+    Process several YouTube videos concurrently.
+
+    Transcript fetches run in worker threads, so the YouTube round trips overlap
+    and the batch takes roughly as long as its slowest video.
+
+    Args:
+        urls: YouTube URLs
+
+    Returns:
+        One entry per input URL, in order: its Video, or the exception raised
+        while processing it
+    """
+    return await asyncio.gather(*[process_video(url) for url in urls], return_exceptions=True)
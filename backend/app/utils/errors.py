@@ -29,3 +29,9 @@ class ExtractionError(TrekiException):
     """Raised when place extraction fails."""
 
     pass
+
+
+class InvalidBatchError(TrekiException):
+    """Raised when an extraction batch ID is unknown or already collected."""
+
+    pass
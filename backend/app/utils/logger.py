@@ -17,6 +17,10 @@ def setup_logger(name: str = __name__) -> logging.Logger:
         Configured logger instance
     """
     logger = logging.getLogger(name)
+    # Already configured (e.g. the module was imported before): nothing to build
+    if logger.handlers:
+        return logger
+
     logger.setLevel(settings.log_level)
 
     # Console handler
@@ -29,9 +33,6 @@ def setup_logger(name: str = __name__) -> logging.Logger:
         datefmt="%Y-%m-%d %H:%M:%S",
     )
     handler.setFormatter(formatter)
-
-    # Add handler if not already added
-    if not logger.handlers:
-        logger.addHandler(handler)
+    logger.addHandler(handler)
 
     return logger
@@ -0,0 +1,75 @@
+"""Token counting helpers for sizing LLM prompts."""
+
+from functools import lru_cache
+
+import tiktoken
+
+from app.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Rough characters-per-token ratio used when the tokenizer is unavailable
+CHARS_PER_TOKEN = 4
+
+
+@lru_cache(maxsize=1)
+def get_encoding() -> tiktoken.Encoding | None:
+    """
+    Load the tokenizer once per process.
+
+    tiktoken downloads its BPE ranks on first use, so this can fail in
+    environments without network access. Callers fall back to a
+    characters-per-token estimate in that case.
+
+    Returns:
+        tiktoken Encoding, or None if it could not be loaded
+    """
+    try:
+        return tiktoken.encoding_for_model("gpt-4")
+    except Exception as e:
+        logger.warning("Tokenizer unavailable, estimating token counts: %s", e)
+        return None
+
+
+def count_tokens(text: str) -> int:
+    """Count (or estimate) the number of tokens in text."""
+    encoding = get_encoding()
+    if encoding is None:
+        return -(-len(text) // CHARS_PER_TOKEN)
+    return len(encoding.encode(text))
+
+
+def split_by_tokens(text: str, max_tokens: int, overlap: int = 0) -> list[str]:
+    """
+    Split text into windows of at most max_tokens tokens.
+
+    Consecutive windows share `overlap` tokens so that content cut at a window
+    boundary still appears whole in one of them.
+
+    Args:
+        text: Text to split
+        max_tokens: Maximum tokens per window
+        overlap: Tokens repeated at the start of each subsequent window
+
+    Returns:
+        List of text windows (a single window if text already fits)
+    """
+    step = max_tokens - overlap
+    if step <= 0:
+        raise ValueError("overlap must be smaller than max_tokens")
+
+    encoding = get_encoding()
+    if encoding is None:
+        # Character-based fallback with the same window geometry
+        size, stride = max_tokens * CHARS_PER_TOKEN, step * CHARS_PER_TOKEN
+        if len(text) <= size:
+            return [text]
+        return [text[i : i + size] for i in range(0, len(text) - overlap * CHARS_PER_TOKEN, stride)]
+
+    tokens = encoding.encode(text)
+    if len(tokens) <= max_tokens:
+        return [text]
+    return [
+        encoding.decode(tokens[i : i + max_tokens])
+        for i in range(0, len(tokens) - overlap, step)
+    ]
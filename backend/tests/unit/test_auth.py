@@ -0,0 +1,118 @@
+"""Tests for Clerk authentication helpers."""
+
+import time
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from starlette.requests import Request
+
+from app.api import auth
+from app.services.http_client import close_http_client
+
+
+@pytest.fixture(autouse=True)
+def clear_user_cache():
+    """Start every test with empty user and token caches."""
+    auth._user_cache.clear()
+    auth._token_cache.clear()
+    yield
+    auth._user_cache.clear()
+    auth._token_cache.clear()
+
+
+@pytest.fixture
+def mock_users_get(monkeypatch):
+    """Mock the Clerk users.get_async SDK call."""
+    users_get = AsyncMock(
+        return_value=SimpleNamespace(
+            email_addresses=[SimpleNamespace(email_address="traveler@example.com")],
+            first_name="Ada",
+            last_name="Lovelace",
+        )
+    )
+    monkeypatch.setattr(auth.get_clerk_client().users, "get_async", users_get)
+    return users_get
+
+
+@pytest.mark.asyncio
+async def test_get_user_cached_fetches_once(mock_users_get):
+    """Test that repeat lookups for the same user are served from the cache."""
+    first = await auth._get_user_cached("user_123")
+    second = await auth._get_user_cached("user_123")
+
+    assert first == second
+    assert first["email"] == "traveler@example.com"
+    mock_users_get.assert_called_once_with(user_id="user_123")
+
+
+@pytest.mark.asyncio
+async def test_get_user_cached_does_not_cache_failures(mock_users_get):
+    """Test that failed lookups are retried on the next request."""
+    mock_users_get.side_effect = [RuntimeError("Clerk unavailable"), mock_users_get.return_value]
+
+    with pytest.raises(RuntimeError):
+        await auth._get_user_cached("user_123")
+    user_info = await auth._get_user_cached("user_123")
+
+    assert user_info["first_name"] == "Ada"
+    assert mock_users_get.call_count == 2
+
+
+def _request(token: str) -> Request:
+    """Build a request carrying a bearer token."""
+    return Request(
+        {
+            "type": "http",
+            "method": "GET",
+            "scheme": "http",
+            "server": ("testserver", 80),
+            "path": "/api/session",
+            "query_string": b"",
+            "headers": [(b"authorization", f"Bearer {token}".encode())],
+        }
+    )
+
+
+@pytest.fixture
+def mock_authenticate(monkeypatch, mock_users_get):
+    """Mock Clerk token verification, returning claims that expire in a minute."""
+    authenticate = MagicMock(
+        return_value=SimpleNamespace(
+            is_signed_in=True, payload={"sub": "user_123", "exp": time.time() + 60}
+        )
+    )
+    monkeypatch.setattr(auth.get_clerk_client(), "authenticate_request", authenticate)
+    return authenticate
+
+
+@pytest.mark.asyncio
+async def test_get_current_user_caches_verified_tokens(mock_authenticate):
+    """Test that a token is verified once and its claims reused on repeat requests."""
+    first = await auth.get_current_user(_request("token-a"))
+    second = await auth.get_current_user(_request("token-a"))
+    await auth.get_current_user(_request("token-b"))
+
+    assert first["user_id"] == second["user_id"] == "user_123"
+    assert mock_authenticate.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_get_current_user_reverifies_expired_tokens(mock_authenticate):
+    """Test that cached claims are not used once the token has expired."""
+    mock_authenticate.return_value.payload["exp"] = time.time() - 1
+
+    await auth.get_current_user(_request("token-a"))
+    await auth.get_current_user(_request("token-a"))
+
+    assert mock_authenticate.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_clerk_client_is_rebuilt_after_http_client_closed():
+    """Test that closing the shared HTTP client drops the Clerk client bound to it."""
+    first = auth.get_clerk_client()
+
+    await close_http_client()
+
+    assert auth.get_clerk_client() is not first
@@ -0,0 +1,194 @@
+"""Tests for batch API place extraction."""
+
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import orjson
+import pytest
+
+from app.agents import batch_extraction
+from app.agents.batch_extraction import (
+    build_anthropic_batch_requests,
+    build_batch_input,
+    collect_extraction_batch,
+    parse_anthropic_batch_results,
+    parse_batch_output,
+)
+from app.agents.extraction import ExtractedPlace, LLMExtractionResult
+from app.models.place import PlaceType
+from app.models.video import Video
+from app.services import extraction_cache
+from app.utils.errors import InvalidBatchError
+
+
+@pytest.fixture(autouse=True)
+def clear_state():
+    """Start every test with no pending jobs and an empty extraction cache."""
+    batch_extraction._jobs.clear()
+    extraction_cache.clear()
+    yield
+    batch_extraction._jobs.clear()
+    extraction_cache.clear()
+
+
+@pytest.fixture
+def sample_video():
+    """Create a sample video for testing."""
+    return Video(
+        video_id="test123",
+        title="Paris Food Tour",
+        duration_seconds=600,
+        transcript="I visited this amazing restaurant called Le Bistro.",
+        url="https://youtube.com/watch?v=test123",
+    )
+
+
+def _output_line(custom_id: str, result: LLMExtractionResult, status_code: int = 200) -> str:
+    """Build one Batch API output line."""
+    body = {"choices": [{"message": {"content": result.model_dump_json()}}]}
+    return orjson.dumps(
+        {"custom_id": custom_id, "response": {"status_code": status_code, "body": body}}
+    ).decode()
+
+
+def _anthropic_entry(custom_id: str, result: LLMExtractionResult | None) -> SimpleNamespace:
+    """Build one Message Batches API result entry (errored if result is None)."""
+    if result is None:
+        return SimpleNamespace(custom_id=custom_id, result=SimpleNamespace(type="errored"))
+    block = SimpleNamespace(type="tool_use", input=result.model_dump(mode="json"))
+    message = SimpleNamespace(content=[block])
+    return SimpleNamespace(
+        custom_id=custom_id, result=SimpleNamespace(type="succeeded", message=message)
+    )
+
+
+def _result(name: str, title: str = "Paris Food Tour") -> LLMExtractionResult:
+    return LLMExtractionResult(
+        suggested_title=title,
+        suggested_summary="A delightful tour of Parisian cuisine.",
+        places=[
+            ExtractedPlace(
+                name=name,
+                type=PlaceType.RESTAURANT,
+                description="French restaurant",
+                mentioned_context="Amazing",
+            )
+        ],
+    )
+
+
+def test_build_batch_input(sample_video):
+    """Test that each video becomes one chat completion request line."""
+    lines = build_batch_input([sample_video]).splitlines()
+
+    assert len(lines) == 1
+    request = orjson.loads(lines[0])
+    assert request["custom_id"] == "test123-0"
+    assert request["url"] == "/v1/chat/completions"
+    assert request["body"]["response_format"]["type"] == "json_schema"
+    assert request["body"]["messages"][0]["role"] == "system"
+
+
+def test_build_anthropic_batch_requests(sample_video):
+    """Test that each video becomes one forced tool-call message request."""
+    requests = build_anthropic_batch_requests([sample_video])
+
+    assert len(requests) == 1
+    assert requests[0]["custom_id"] == "test123-0"
+    params = requests[0]["params"]
+    assert params["tool_choice"] == {"type": "tool", "name": "LLMExtractionResult"}
+    assert params["system"][0]["cache_control"] == {"type": "ephemeral"}
+    assert [m["role"] for m in params["messages"]] == ["user"]
+
+
+def test_parse_anthropic_batch_results_merges_chunks_and_drops_failures():
+    """Test that tool-call inputs merge per video and errored videos are dropped."""
+    results = parse_anthropic_batch_results(
+        [
+            _anthropic_entry("vid_a-1", _result("Cafe Two")),
+            _anthropic_entry("vid_a-0", _result("Le Bistro")),
+            _anthropic_entry("vid_b-0", None),
+        ]
+    )
+
+    assert set(results) == {"vid_a"}
+    assert [p.name for p in results["vid_a"].places] == ["Le Bistro", "Cafe Two"]
+
+
+def test_parse_batch_output_merges_chunks_and_drops_failures():
+    """Test that chunks merge in order and partially failed videos are dropped."""
+    output = "\n".join(
+        [
+            _output_line("vid_a-1", _result("Cafe Two", title="Second")),
+            _output_line("vid_a-0", _result("Le Bistro", title="First")),
+            _output_line("vid_b-0", _result("Louvre")),
+            _output_line("vid_b-1", _result("Orsay"), status_code=500),
+        ]
+    )
+
+    results = parse_batch_output(output)
+
+    assert set(results) == {"vid_a"}
+    assert results["vid_a"].suggested_title == "First"
+    assert [p.name for p in results["vid_a"].places] == ["Le Bistro", "Cafe Two"]
+
+
+@pytest.mark.asyncio
+async def test_collect_extraction_batch(sample_video, monkeypatch):
+    """Test that a completed batch is collected once and its results cached."""
+    client = MagicMock()
+    client.batches.retrieve = AsyncMock(
+        return_value=SimpleNamespace(status="completed", output_file_id="file-out")
+    )
+    client.files.content = AsyncMock(
+        return_value=SimpleNamespace(text=_output_line("test123-0", _result("Le Bistro")))
+    )
+    monkeypatch.setattr(batch_extraction, "_get_openai_client", lambda: client)
+    batch_extraction._jobs.set(
+        "batch_1",
+        batch_extraction.ExtractionBatchJob(
+            batch_id="batch_1", session_id="session_1", videos=[sample_video]
+        ),
+    )
+
+    job, status, results = await collect_extraction_batch("batch_1")
+
+    assert status == "completed"
+    assert job.session_id == "session_1"
+    assert results["test123"].places[0].video_id == "test123"
+
+    # Results are handed out once, and are now served from the extraction cache
+    with pytest.raises(InvalidBatchError):
+        await collect_extraction_batch("batch_1")
+    batch_id, cached = await batch_extraction.submit_extraction_batch("session_2", [sample_video])
+    assert batch_id is None
+    assert cached["test123"].places[0].name == "Le Bistro"
+
+
+@pytest.mark.asyncio
+async def test_collect_anthropic_extraction_batch(sample_video, monkeypatch):
+    """Test that an ended Anthropic batch is reported as completed with its results."""
+
+    async def _results():
+        yield _anthropic_entry("test123-0", _result("Le Bistro"))
+
+    client = MagicMock()
+    client.messages.batches.retrieve = AsyncMock(
+        return_value=SimpleNamespace(processing_status="ended")
+    )
+    client.messages.batches.results = AsyncMock(return_value=_results())
+    monkeypatch.setattr(batch_extraction, "_get_anthropic_client", lambda: client)
+    batch_extraction._jobs.set(
+        "msgbatch_1",
+        batch_extraction.ExtractionBatchJob(
+            batch_id="msgbatch_1",
+            session_id="session_1",
+            provider="anthropic",
+            videos=[sample_video],
+        ),
+    )
+
+    _, status, results = await collect_extraction_batch("msgbatch_1")
+
+    assert status == "completed"
+    assert results["test123"].places[0].name == "Le Bistro"
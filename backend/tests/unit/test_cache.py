@@ -0,0 +1,40 @@
+"""Tests for in-memory caching helpers."""
+
+from app.utils import cache
+from app.utils.cache import TTLCache
+
+
+class TestTTLCache:
+    """Tests for TTLCache class."""
+
+    def test_set_and_get(self):
+        """Test storing and retrieving a value."""
+        ttl_cache = TTLCache(maxsize=2, ttl_seconds=60)
+        ttl_cache.set("a", 1)
+
+        assert ttl_cache.get("a") == 1
+        assert ttl_cache.get("missing") is None
+        assert "a" in ttl_cache
+
+    def test_entries_expire(self, monkeypatch):
+        """Test that entries are dropped once their TTL elapses."""
+        now = 1000.0
+        monkeypatch.setattr(cache.time, "monotonic", lambda: now)
+        ttl_cache = TTLCache(maxsize=2, ttl_seconds=60)
+        ttl_cache.set("a", 1)
+
+        now += 61
+        assert ttl_cache.get("a") is None
+        assert len(ttl_cache) == 0
+
+    def test_evicts_least_recently_used(self):
+        """Test that the least recently used entry is evicted when full."""
+        ttl_cache = TTLCache(maxsize=2, ttl_seconds=60)
+        ttl_cache.set("a", 1)
+        ttl_cache.set("b", 2)
+        ttl_cache.get("a")  # "b" is now least recently used
+        ttl_cache.set("c", 3)
+
+        assert ttl_cache.get("a") == 1
+        assert ttl_cache.get("b") is None
+        assert ttl_cache.get("c") == 3
@@ -0,0 +1,170 @@
+"""Tests for the chat agent."""
+
+import threading
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.tools import tool
+
+from app.agents.chat_agent import (
+    _execute_tool_calls,
+    _run_tool,
+    chat_with_agent,
+    create_search_places_tool,
+)
+from app.models.place import Place, PlaceType
+from app.models.session import Session
+
+
+@pytest.fixture
+def session():
+    """Create a session with a couple of places."""
+    return Session(
+        places=[
+            Place(
+                name="Sushi Dai",
+                type=PlaceType.RESTAURANT,
+                description="Famous sushi counter",
+                video_id="vid1",
+                mentioned_context="Best breakfast sushi",
+            ),
+            Place(
+                name="Senso-ji",
+                type=PlaceType.ATTRACTION,
+                description="Ancient temple",
+                video_id="vid1",
+                mentioned_context="Go early to avoid crowds",
+            ),
+        ]
+    )
+
+
+@pytest.mark.asyncio
+async def test_execute_tool_calls_runs_tools_concurrently(session):
+    """Test that independent tool calls overlap instead of running one by one."""
+    # Each tool blocks until the other has started, so sequential dispatch would time out
+    barrier = threading.Barrier(2, timeout=2)
+
+    @tool
+    def first(value: str) -> str:
+        """First tool."""
+        barrier.wait()
+        return value
+
+    @tool
+    def second(value: str) -> str:
+        """Second tool."""
+        barrier.wait()
+        return value
+
+    tool_calls = [
+        {"name": "first", "args": {"value": "a"}, "id": "call-1"},
+        {"name": "second", "args": {"value": "b"}, "id": "call-2"},
+    ]
+
+    tool_messages, place_ids = await _execute_tool_calls(
+        tool_calls, [first, second], session
+    )
+
+    assert [m.content for m in tool_messages] == ["a", "b"]
+    assert [m.tool_call_id for m in tool_messages] == ["call-1", "call-2"]
+    assert place_ids == []
+
+
+@pytest.mark.asyncio
+async def test_run_tool_keeps_sync_tools_off_the_event_loop():
+    """Test that sync tools run in a worker thread and async tools on the loop."""
+    loop_thread = threading.get_ident()
+
+    @tool
+    def sync_tool() -> int:
+        """Sync tool."""
+        return threading.get_ident()
+
+    @tool
+    async def async_tool() -> int:
+        """Async tool."""
+        return threading.get_ident()
+
+    assert await _run_tool(sync_tool, {}) != loop_thread
+    assert await _run_tool(async_tool, {}) == loop_thread
+
+
+@pytest.mark.asyncio
+async def test_execute_tool_calls_tracks_referenced_places(session):
+    """Test that search results are resolved to place IDs and unknown tools reported."""
+    search_tool = create_search_places_tool(session)
+    tool_calls = [
+        {"name": "search_places", "args": {"query": "sushi"}, "id": "call-1"},
+        {"name": "missing_tool", "args": {}, "id": "call-2"},
+    ]
+
+    tool_messages, place_ids = await _execute_tool_calls(tool_calls, [search_tool], session)
+
+    assert place_ids == [session.places[0].id]
+    assert "Sushi Dai" in tool_messages[0].content
+    assert tool_messages[1].content == "Unknown tool: missing_tool"
+
+
+@pytest.mark.asyncio
+async def test_chat_with_agent_sends_tool_results_back_to_model(session):
+    """Test that the final reply comes from a follow-up call that sees the tool results."""
+    tool_call_reply = AIMessage(
+        content="",
+        tool_calls=[{"name": "search_places", "args": {"query": "temple"}, "id": "call-1"}],
+    )
+    final_reply = AIMessage(content="Visit Senso-ji early in the morning.")
+    model = MagicMock()
+    model.ainvoke = AsyncMock(side_effect=[tool_call_reply, final_reply])
+
+    llm_client = MagicMock()
+    llm_client.bind_tools.return_value = model
+
+    async def run_limited(factory):
+        return await factory()
+
+    llm_client.run_limited = run_limited
+    llm_client.ainvoke = lambda runnable, messages: runnable.ainvoke(messages)
+
+    reply, place_ids = await chat_with_agent(session, "Any temples?", llm_client)
+
+    assert reply == "Visit Senso-ji early in the morning."
+    assert place_ids == [session.places[1].id]
+    follow_up_messages = model.ainvoke.call_args_list[1].args[0]
+    assert follow_up_messages[-2] is tool_call_reply
+    assert isinstance(follow_up_messages[-1], ToolMessage)
+    assert follow_up_messages[-1].tool_call_id == "call-1"
+
+
+def test_search_places_filters_by_type_and_query(session):
+    """Test case-insensitive search across fields combined with the type filter."""
+    search_tool = create_search_places_tool(session)
+
+    assert [p["name"] for p in search_tool.invoke({"query": "CROWDS"})] == ["Senso-ji"]
+    assert [p["name"] for p in search_tool.invoke({"place_type": "Restaurant"})] == [
+        "Sushi Dai"
+    ]
+    assert search_tool.invoke({"query": "sushi", "place_type": "attraction"}) == []
+    # Queries never match across field boundaries
+    assert search_tool.invoke({"query": "dai famous"}) == []
+    assert len(search_tool.invoke({"place_type": "unknown"})) == 2
+
+
+def test_search_places_matches_any_keyword(session):
+    """Test that keywords are OR-matched and combine with the other filters."""
+    search_tool = create_search_places_tool(session)
+
+    names = [p["name"] for p in search_tool.invoke({"keywords": ["TEMPLE", "breakfast"]})]
+    assert names == ["Sushi Dai", "Senso-ji"]
+    assert search_tool.invoke({"keywords": ["temple"], "place_type": "restaurant"}) == []
+    assert search_tool.invoke({"keywords": ["a.c"]}) == []
+
+
+def test_search_places_stops_scanning_at_limit(session):
+    """Test that the limit is applied while scanning, not after."""
+    search_tool = create_search_places_tool(session)
+
+    assert [p["name"] for p in search_tool.invoke({"limit": 1})] == ["Sushi Dai"]
+    assert [p["name"] for p in search_tool.invoke({"query": "e", "limit": 1})] == ["Sushi Dai"]
+    assert search_tool.invoke({"limit": -1}) == []
@@ -1,13 +1,34 @@
 """Tests for place extraction."""
 
+import asyncio
 from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 
-from app.agents.extraction import PlaceExtractionResult, extract_places_from_video
-from app.models.place import Place, PlaceType
+from app.agents.extraction import (
+    BatchedVideoExtraction,
+    BatchExtractionResult,
+    ExtractedPlace,
+    LLMExtractionResult,
+    VideoGroupPacker,
+    extract_places_from_video,
+    extract_places_from_videos,
+    extract_places_from_videos_batched,
+    group_videos_for_batching,
+)
+from app.models.place import PlaceType
 from app.models.video import Video
+from app.services import extraction_cache
 from app.services.llm_client import LLMClient
+from app.utils.errors import ExtractionError
+
+
+@pytest.fixture(autouse=True)
+def clear_extraction_cache():
+    """Start every test with an empty extraction cache."""
+    extraction_cache.clear()
+    yield
+    extraction_cache.clear()
 
 
 @pytest.fixture
@@ -27,14 +48,13 @@ def sample_video():
 def mock_llm_client():
     """Create a mock LLM client."""
     client = MagicMock(spec=LLMClient)
-    client.provider = "openai"
+    client.provider = "anthropic"
 
     # Mock the structured output response
     client.invoke_structured = AsyncMock(
-        return_value=PlaceExtractionResult(
+        return_value=LLMExtractionResult(
             places=[
-                Place(
-                    video_id="test123",
+                ExtractedPlace(
                     name="Le Bistro",
                     type=PlaceType.RESTAURANT,
                     description="Amazing French restaurant",
@@ -75,18 +95,16 @@ async def test_extract_places_with_multiple_results(sample_video, mock_llm_clien
     """Test extracting multiple places from a video."""
     # Mock response with multiple places
     mock_llm_client.invoke_structured = AsyncMock(
-        return_value=PlaceExtractionResult(
+        return_value=LLMExtractionResult(
             places=[
-                Place(
-                    video_id="test123",
+                ExtractedPlace(
                     name="Le Bistro",
                     type=PlaceType.RESTAURANT,
                     description="French restaurant",
                     timestamp_seconds=120,
                     mentioned_context="Great food",
                 ),
-                Place(
-                    video_id="test123",
+                ExtractedPlace(
                     name="Eiffel Tower",
                     type=PlaceType.ATTRACTION,
                     description="Iconic landmark",
@@ -111,3 +129,255 @@ async def test_extract_places_with_multiple_results(sample_video, mock_llm_clien
     assert places[1].type == PlaceType.ATTRACTION
     assert suggested_title == "Best of Paris"
     assert suggested_summary == "Exploring top spots in Paris."
+
+
+@pytest.mark.asyncio
+async def test_extract_places_uses_cache_on_repeat(sample_video, mock_llm_client):
+    """Test that re-extracting the same video skips the LLM call."""
+    first = await extract_places_from_video(sample_video, mock_llm_client)
+    second = await extract_places_from_video(sample_video, mock_llm_client)
+
+    assert [p.name for p in second.places] == [p.name for p in first.places]
+    assert second.suggested_title == first.suggested_title
+    # Place IDs are fresh for each extraction
+    assert second.places[0].id != first.places[0].id
+    mock_llm_client.invoke_structured.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_extract_places_shares_concurrent_identical_calls(sample_video, mock_llm_client):
+    """Test that concurrent extractions of the same video make one LLM call."""
+    first, second = await asyncio.gather(
+        extract_places_from_video(sample_video, mock_llm_client),
+        extract_places_from_video(sample_video, mock_llm_client),
+    )
+
+    assert [p.name for p in second.places] == [p.name for p in first.places]
+    mock_llm_client.invoke_structured.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_shared_extraction_survives_cancelled_owner(mock_llm_client):
+    """Test that cancelling the request that started an extraction doesn't fail its waiters."""
+    result = mock_llm_client.invoke_structured.return_value
+    started, release = asyncio.Event(), asyncio.Event()
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        started.set()
+        await release.wait()
+        return result
+
+    owner = asyncio.create_task(extraction_cache.get_or_compute("transcript", "variant", compute))
+    await started.wait()
+    waiter = asyncio.create_task(extraction_cache.get_or_compute("transcript", "variant", compute))
+    await asyncio.sleep(0)
+
+    owner.cancel()
+    release.set()
+
+    assert await waiter == (result, True)
+    with pytest.raises(asyncio.CancelledError):
+        await owner
+    assert calls == 1
+    assert extraction_cache.get("transcript", "variant") is result
+
+
+@pytest.mark.asyncio
+async def test_extract_places_from_videos_returns_errors_in_place(sample_video, mock_llm_client):
+    """Test that one failing video doesn't prevent results for the others."""
+    result = mock_llm_client.invoke_structured.return_value
+    broken = sample_video.model_copy(update={"video_id": "broken", "transcript": "boom"})
+
+    async def invoke_structured(messages, schema):
+        if "boom" in messages[-1]["content"]:
+            raise RuntimeError("provider error")
+        return result
+
+    mock_llm_client.invoke_structured = AsyncMock(side_effect=invoke_structured)
+
+    ok, failed = await extract_places_from_videos([sample_video, broken], mock_llm_client)
+
+    assert ok.places[0].video_id == "test123"
+    assert isinstance(failed, ExtractionError)
+
+
+@pytest.mark.asyncio
+async def test_extract_places_cache_matches_reuploaded_transcript(
+    sample_video, mock_llm_client
+):
+    """Test that a re-upload with only cosmetic caption changes hits the cache."""
+    await extract_places_from_video(sample_video, mock_llm_client)
+
+    reupload = sample_video.model_copy(
+        update={
+            "video_id": "reupload456",
+            "transcript": sample_video.transcript.upper().replace(".", "  ."),
+        }
+    )
+    extraction = await extract_places_from_video(reupload, mock_llm_client)
+
+    assert extraction.places[0].video_id == "reupload456"
+    mock_llm_client.invoke_structured.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_extract_places_chunks_long_transcript(sample_video, mock_llm_client):
+    """Test that long transcripts are extracted per chunk and merged."""
+    long_video = sample_video.model_copy(update={"transcript": "word " * 10_000})
+    chunk_results = [
+        LLMExtractionResult(
+            places=[
+                ExtractedPlace(
+                    name="Le Bistro",
+                    type=PlaceType.RESTAURANT,
+                    description="French restaurant",
+                    timestamp_seconds=None,
+                    mentioned_context="Great food",
+                )
+            ],
+            suggested_title="Paris Food Tour",
+            suggested_summary="A delightful tour of Parisian cuisine.",
+        ),
+        LLMExtractionResult(
+            places=[
+                ExtractedPlace(
+                    name="le bistro ",
+                    type=PlaceType.RESTAURANT,
+                    description="French restaurant",
+                    timestamp_seconds=300,
+                    mentioned_context="Try the duck",
+                ),
+                ExtractedPlace(
+                    name="Eiffel Tower",
+                    type=PlaceType.ATTRACTION,
+                    description="Iconic landmark",
+                    mentioned_context="Must visit",
+                ),
+            ],
+            suggested_title="Later Title",
+            suggested_summary="Later summary.",
+        ),
+    ]
+    calls = []
+
+    async def invoke_structured(messages, schema):
+        calls.append(messages)
+        return chunk_results[min(len(calls) - 1, 1)]
+
+    mock_llm_client.invoke_structured = AsyncMock(side_effect=invoke_structured)
+
+    extraction = await extract_places_from_video(long_video, mock_llm_client)
+
+    assert len(calls) > 1
+    assert [p.name for p in extraction.places] == ["Le Bistro", "Eiffel Tower"]
+    assert extraction.places[0].timestamp_seconds == 300
+    assert extraction.places[0].mentioned_context == "Great food Try the duck"
+    assert extraction.suggested_title == "Paris Food Tour"
+
+
+@pytest.mark.asyncio
+async def test_extract_places_cache_is_keyed_on_variant(sample_video, mock_llm_client):
+    """Test that a different model misses every cache tier, even for the same video."""
+    mock_llm_client.get_model_name.return_value = "model-a"
+    await extract_places_from_video(sample_video, mock_llm_client)
+
+    mock_llm_client.get_model_name.return_value = "model-b"
+    await extract_places_from_video(sample_video, mock_llm_client)
+
+    assert mock_llm_client.invoke_structured.call_count == 2
+
+
+def test_extraction_cache_keys_on_transcript_and_variant(sample_video):
+    """Test that a changed transcript or variant misses the cache."""
+    result = LLMExtractionResult(places=[], suggested_title="Old", suggested_summary="Old")
+    extraction_cache.put(sample_video.transcript, "variant", result)
+
+    assert extraction_cache.get(sample_video.transcript, "variant") is result
+    assert extraction_cache.get("A completely different transcript", "variant") is None
+    assert extraction_cache.get(sample_video.transcript, "other-variant") is None
+
+
+def test_group_videos_for_batching(sample_video):
+    """Test that short transcripts are packed together and long ones kept apart."""
+    short_a = sample_video.model_copy(update={"video_id": "a"})
+    short_b = sample_video.model_copy(update={"video_id": "b"})
+    long_video = sample_video.model_copy(
+        update={"video_id": "long", "transcript": "word " * 10_000}
+    )
+
+    groups = group_videos_for_batching([short_a, long_video, short_b])
+
+    assert [[v.video_id for v in group] for group in groups] == [["long"], ["a", "b"]]
+
+
+def test_video_group_packer_caps_videos_per_group(sample_video):
+    """Test that groups are split by video count even when tokens would fit."""
+    packer = VideoGroupPacker(max_tokens=10_000, max_videos=2)
+    videos = [sample_video.model_copy(update={"video_id": str(i)}) for i in range(5)]
+
+    groups = [group for video in videos for group in packer.add(video, 10)]
+    groups.extend(packer.flush())
+
+    assert [[v.video_id for v in group] for group in groups] == [["0", "1"], ["2", "3"], ["4"]]
+
+
+@pytest.mark.asyncio
+async def test_extract_places_from_videos_batched(sample_video, mock_llm_client):
+    """Test that a batch call is demultiplexed by video_id."""
+    video_a = sample_video.model_copy(update={"video_id": "a"})
+    video_b = sample_video.model_copy(update={"video_id": "b"})
+    video_c = sample_video.model_copy(update={"video_id": "c"})
+    mock_llm_client.invoke_structured = AsyncMock(
+        return_value=BatchExtractionResult(
+            videos=[
+                BatchedVideoExtraction(
+                    video_id="b",
+                    suggested_title="Video B",
+                    suggested_summary="Summary B",
+                    places=[
+                        ExtractedPlace(
+                            name="Eiffel Tower",
+                            type=PlaceType.ATTRACTION,
+                            description="Iconic landmark",
+                            mentioned_context="Must visit",
+                        )
+                    ],
+                ),
+                BatchedVideoExtraction(
+                    video_id="a",
+                    suggested_title="Video A",
+                    suggested_summary="Summary A",
+                    places=[],
+                ),
+            ]
+        )
+    )
+
+    results = await extract_places_from_videos_batched(
+        [video_a, video_b, video_c], mock_llm_client
+    )
+
+    mock_llm_client.invoke_structured.assert_called_once()
+    assert results[0].suggested_title == "Video A"
+    assert results[1].places[0].name == "Eiffel Tower"
+    assert results[1].places[0].video_id == "b"
+    assert results[2] is None
+
+
+@pytest.mark.asyncio
+async def test_extract_places_uses_json_schema_for_openai(sample_video, mock_llm_client):
+    """Test that OpenAI extraction goes through the JSON-schema fast path."""
+    mock_llm_client.provider = "openai"
+    mock_llm_client.invoke_json_schema = AsyncMock(
+        return_value=mock_llm_client.invoke_structured.return_value
+    )
+
+    extraction = await extract_places_from_video(sample_video, mock_llm_client)
+
+    assert extraction.places[0].name == "Le Bistro"
+    mock_llm_client.invoke_json_schema.assert_called_once()
+    assert mock_llm_client.invoke_json_schema.call_args.args[1] is LLMExtractionResult
+    mock_llm_client.invoke_structured.assert_not_called()
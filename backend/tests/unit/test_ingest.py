@@ -0,0 +1,213 @@
+"""Tests for ingestion request handling."""
+
+import asyncio
+from unittest.mock import MagicMock
+
+import orjson
+import pytest
+from pydantic import ValidationError
+
+from app.api.routes import ingest
+from app.api.routes.ingest import (
+    IngestRequest,
+    _fetch_and_extract,
+    _new_video_urls,
+    ingest_videos_stream,
+)
+from app.models.place import Place, PlaceType
+from app.models.session import Session
+from app.models.video import Video
+
+
+class TestIngestRequest:
+    """Tests for ingest request URL validation."""
+
+    def test_deduplicates_equivalent_urls(self):
+        """Test that URLs for the same video collapse to one canonical URL."""
+        request = IngestRequest(
+            video_urls=[
+                "https://www.youtube.com/watch?v=dQw4w9WgXcQ",
+                "https://youtu.be/dQw4w9WgXcQ?si=abc",
+                "https://youtu.be/dGHezUZ51lQ",
+            ]
+        )
+
+        assert request.video_urls == [
+            "https://www.youtube.com/watch?v=dQw4w9WgXcQ",
+            "https://www.youtube.com/watch?v=dGHezUZ51lQ",
+        ]
+
+    def test_rejects_invalid_url(self):
+        """Test that a malformed URL fails validation."""
+        with pytest.raises(ValidationError):
+            IngestRequest(video_urls=["https://not-youtube.com/somepage"])
+
+
+def test_new_video_urls_skips_videos_in_session():
+    """Test that videos already in the session are not ingested again."""
+    session = Session(
+        videos=[
+            Video(
+                video_id="dQw4w9WgXcQ",
+                title="Existing",
+                duration_seconds=600,
+                transcript="",
+                url="https://www.youtube.com/watch?v=dQw4w9WgXcQ",
+            )
+        ]
+    )
+    urls = [
+        "https://www.youtube.com/watch?v=dQw4w9WgXcQ",
+        "https://www.youtube.com/watch?v=dGHezUZ51lQ",
+    ]
+
+    assert _new_video_urls(session, urls) == ["https://www.youtube.com/watch?v=dGHezUZ51lQ"]
+
+
+@pytest.mark.asyncio
+async def test_fetch_and_extract_overlaps_fetching_and_extraction(monkeypatch):
+    """Test that extraction starts before all fetches finish, and results keep request order."""
+    long_fetched = asyncio.Event()
+    extracted_long = asyncio.Event()
+
+    async def fake_process_video(url: str) -> Video:
+        video_id = url.rsplit("=", 1)[1]
+        if video_id == "failing":
+            raise ValueError("no transcript")
+        if video_id == "short":
+            # Only completes once the long video has gone through extraction
+            await long_fetched.wait()
+            await extracted_long.wait()
+        transcript = "word " * 10_000 if video_id == "long" else "short transcript"
+        if video_id == "long":
+            long_fetched.set()
+        return Video(
+            video_id=video_id,
+            title=video_id,
+            duration_seconds=60,
+            transcript=transcript,
+            url=url,
+        )
+
+    async def fake_extract_group(videos, llm_client, semaphore):
+        if [v.video_id for v in videos] == ["long"]:
+            extracted_long.set()
+        return [MagicMock(places=[]) for _ in videos]
+
+    monkeypatch.setattr(ingest, "process_video", fake_process_video)
+    monkeypatch.setattr(ingest, "_extract_group", fake_extract_group)
+    urls = [f"https://www.youtube.com/watch?v={vid}" for vid in ("short", "failing", "long")]
+
+    videos, extracted = await asyncio.wait_for(_fetch_and_extract(urls, MagicMock()), 5)
+
+    assert [v.video_id for v in videos] == ["short", "long"]
+    assert set(extracted) == {"short", "long"}
+
+
+@pytest.mark.asyncio
+async def test_fetch_and_extract_dispatches_lingering_short_videos(monkeypatch):
+    """Test that a short video is extracted without waiting for slow fetches to finish."""
+    extracted_fast = asyncio.Event()
+
+    async def fake_process_video(url: str) -> Video:
+        video_id = url.rsplit("=", 1)[1]
+        if video_id == "slow":
+            await extracted_fast.wait()
+        return Video(
+            video_id=video_id, title=video_id, duration_seconds=60, transcript="hi", url=url
+        )
+
+    async def fake_extract_group(videos, llm_client, semaphore):
+        if [v.video_id for v in videos] == ["fast"]:
+            extracted_fast.set()
+        return [MagicMock(places=[]) for _ in videos]
+
+    monkeypatch.setattr(ingest, "process_video", fake_process_video)
+    monkeypatch.setattr(ingest, "_extract_group", fake_extract_group)
+    monkeypatch.setattr(ingest.settings, "ingest_batch_linger_seconds", 0.01)
+    video_ids = ["fast"] + ["slow"] * ingest.SINGLE_CALL_MAX_VIDEOS
+    urls = [f"https://www.youtube.com/watch?v={vid}" for vid in video_ids]
+
+    videos, extracted = await asyncio.wait_for(_fetch_and_extract(urls, MagicMock()), 5)
+
+    assert [v.video_id for v in videos] == video_ids
+    assert set(extracted) == {"fast", "slow"}
+
+
+@pytest.mark.asyncio
+async def test_fetch_and_extract_packs_small_ingestions_into_one_call(monkeypatch):
+    """Test that a small ingestion waits for all transcripts and extracts them together."""
+    groups: list[list[str]] = []
+
+    async def fake_process_video(url: str) -> Video:
+        video_id = url.rsplit("=", 1)[1]
+        await asyncio.sleep(0.05 if video_id == "slow" else 0)
+        return Video(
+            video_id=video_id, title=video_id, duration_seconds=60, transcript="hi", url=url
+        )
+
+    async def fake_extract_group(videos, llm_client, semaphore):
+        groups.append([v.video_id for v in videos])
+        return [MagicMock(places=[]) for _ in videos]
+
+    monkeypatch.setattr(ingest, "process_video", fake_process_video)
+    monkeypatch.setattr(ingest, "_extract_group", fake_extract_group)
+    monkeypatch.setattr(ingest.settings, "ingest_batch_linger_seconds", 0.01)
+    urls = [f"https://www.youtube.com/watch?v={vid}" for vid in ("fast", "slow")]
+
+    await asyncio.wait_for(_fetch_and_extract(urls, MagicMock()), 5)
+
+    assert groups == [["fast", "slow"]]
+
+
+@pytest.mark.asyncio
+async def test_ingest_stream_emits_each_video_then_summary(monkeypatch):
+    """Test that the stream reports each extracted video, then totals including failures."""
+
+    async def fake_process_video(url: str) -> Video:
+        video_id = url.rsplit("=", 1)[1]
+        if video_id == "failingVid1":
+            raise ValueError("no transcript")
+        return Video(
+            video_id=video_id, title=video_id, duration_seconds=60, transcript="hi", url=url
+        )
+
+    async def fake_extract_group(videos, llm_client, semaphore):
+        return [
+            MagicMock(
+                suggested_title=f"Title {video.video_id}",
+                suggested_summary="Summary",
+                places=[
+                    Place(
+                        name="Le Bistro",
+                        type=PlaceType.RESTAURANT,
+                        description="French restaurant",
+                        video_id=video.video_id,
+                        mentioned_context="Great food",
+                    )
+                ],
+            )
+            for video in videos
+        ]
+
+    monkeypatch.setattr(ingest, "process_video", fake_process_video)
+    monkeypatch.setattr(ingest, "_extract_group", fake_extract_group)
+    monkeypatch.setattr(ingest, "create_llm_client", MagicMock())
+    request = IngestRequest(
+        video_urls=[
+            "https://www.youtube.com/watch?v=dQw4w9WgXcQ",
+            "https://www.youtube.com/watch?v=failingVid1",
+        ]
+    )
+
+    response = await ingest_videos_stream(request, {"user_id": "user_123"})
+    frames = [frame async for frame in response.body_iterator]
+    events = [orjson.loads(frame.removeprefix(b"data: ")) for frame in frames]
+
+    assert [e["type"] for e in events] == ["session", "video", "done"]
+    assert events[1]["video"]["title"] == "Title dQw4w9WgXcQ"
+    assert "transcript" not in events[1]["video"]
+    assert events[1]["places"][0]["name"] == "Le Bistro"
+    assert events[2]["videos_ingested"] == 1
+    assert events[2]["videos_failed"] == 1
+    assert events[2]["total_places"] == 1
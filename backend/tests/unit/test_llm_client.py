@@ -0,0 +1,255 @@
+"""Tests for the LLM client."""
+
+import asyncio
+import threading
+import weakref
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from langchain_core.messages import AIMessage
+from tenacity import wait_none
+
+from app.agents.extraction import LLMExtractionResult
+from app.services import llm_client
+from app.services.http_client import close_http_client, get_http_client
+from app.services.llm_client import (
+    LLMClient,
+    create_llm_client,
+    get_provider_metrics,
+    json_schema_response_format,
+)
+
+
+class RateLimitError(Exception):
+    """Stand-in for an SDK 429 error."""
+
+    status_code = 429
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """Create an OpenAI client without real backoff delays."""
+    monkeypatch.setattr(llm_client.settings, "openai_api_key", "test-key")
+    monkeypatch.setattr(llm_client, "_RATE_LIMIT_WAIT", wait_none())
+    llm_client._response_cache.clear()
+    yield LLMClient("openai")
+    llm_client._response_cache.clear()
+
+
+@pytest.mark.asyncio
+async def test_run_limited_retries_rate_limits(client):
+    """Test that 429 responses are retried and counted."""
+    rate_limited_before = get_provider_metrics()["openai"]["rate_limited"]
+    call = AsyncMock(side_effect=[RateLimitError(), "ok"])
+
+    result = await client.run_limited(call)
+
+    assert result == "ok"
+    assert call.call_count == 2
+    metrics = get_provider_metrics()["openai"]
+    assert metrics["rate_limited"] == rate_limited_before + 1
+    assert metrics["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_run_limited_does_not_retry_other_errors(client):
+    """Test that non rate-limit errors propagate immediately."""
+    call = AsyncMock(side_effect=ValueError("boom"))
+
+    with pytest.raises(ValueError):
+        await client.run_limited(call)
+
+    call.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_invoke_serves_identical_requests_from_cache(client):
+    """Test that repeating a request skips the provider, while a new one doesn't."""
+    client._model = MagicMock()
+    client._model.ainvoke = AsyncMock(return_value=AIMessage(content="Try the ramen."))
+    messages = [{"role": "user", "content": "Where should I eat?"}]
+
+    assert await client.invoke(messages) == "Try the ramen."
+    assert await client.invoke(messages) == "Try the ramen."
+    client._model.ainvoke.assert_called_once()
+
+    await client.invoke([{"role": "user", "content": "Where should I stay?"}])
+    assert client._model.ainvoke.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_invoke_structured_cache_returns_private_copies(client):
+    """Test that cached structured results can be mutated without affecting the cache."""
+    result = LLMExtractionResult(places=[], suggested_title="Tokyo", suggested_summary="Food")
+    structured_llm = MagicMock()
+    structured_llm.ainvoke = AsyncMock(return_value=result)
+    client._model = MagicMock()
+    client._model.with_structured_output.return_value = structured_llm
+    messages = [{"role": "user", "content": "Extract places"}]
+
+    first = await client.invoke_structured(messages, LLMExtractionResult)
+    first.suggested_title = "Changed"
+    second = await client.invoke_structured(messages, LLMExtractionResult)
+
+    assert second.suggested_title == "Tokyo"
+    structured_llm.ainvoke.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_stream_limited_retries_only_before_first_chunk(client):
+    """Test that a 429 before any output is retried, but not one mid-stream."""
+    attempts = []
+
+    def make_stream(fail_after: int):
+        async def stream():
+            attempts.append(fail_after)
+            for i in range(3):
+                if i == fail_after:
+                    raise RateLimitError()
+                yield i
+
+        return stream
+
+    streams = iter([make_stream(0), make_stream(3)])
+    chunks = [chunk async for chunk in client.stream_limited(lambda: next(streams)())]
+    assert chunks == [0, 1, 2]
+    assert attempts == [0, 3]
+
+    received = []
+    with pytest.raises(RateLimitError):
+        async for chunk in client.stream_limited(make_stream(1)):
+            received.append(chunk)
+    assert received == [0]
+    assert get_provider_metrics()["openai"]["in_flight"] == 0
+
+
+def test_concurrency_limit_works_across_event_loops(client, monkeypatch):
+    """Test that the provider limit is enforced on each loop, without cross-loop errors."""
+    monkeypatch.setattr(llm_client, "_PROVIDER_LIMITS", {"openai": 1, "anthropic": 1})
+    monkeypatch.setattr(llm_client, "_PROVIDER_SEMAPHORES", weakref.WeakKeyDictionary())
+
+    async def contend():
+        async def call():
+            async with client.concurrency_slot():
+                peak.append(get_provider_metrics()["openai"]["in_flight"])
+                await asyncio.sleep(0)
+
+        await asyncio.gather(call(), call())
+
+    # The second call waits on the semaphore, binding it to the loop it runs on
+    for _ in range(2):
+        peak = []
+        asyncio.run(contend())
+        assert peak == [1, 1]
+
+
+@pytest.mark.asyncio
+async def test_sync_fallback_runs_sync_path_in_thread(monkeypatch):
+    """Test that providers flagged for the sync fallback never use the async path."""
+    monkeypatch.setattr(llm_client.settings, "openai_api_key", "test-key")
+    monkeypatch.setattr(llm_client.settings, "llm_sync_fallback_providers", ["openai"])
+    client = LLMClient("openai")
+    runnable = MagicMock()
+    runnable.invoke.return_value = "sync"
+    runnable.ainvoke = AsyncMock(return_value="async")
+
+    assert await client.ainvoke(runnable, []) == "sync"
+    runnable.ainvoke.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_sync_fallback_streams_sync_path_in_thread(monkeypatch):
+    """Test that streaming also uses the sync path for fallback providers, errors included."""
+    monkeypatch.setattr(llm_client.settings, "openai_api_key", "test-key")
+    monkeypatch.setattr(llm_client.settings, "llm_sync_fallback_providers", ["openai"])
+    client = LLMClient("openai")
+    loop_thread = threading.get_ident()
+    threads = set()
+
+    def stream(messages):
+        for i in range(3):
+            threads.add(threading.get_ident())
+            yield i
+        raise RuntimeError("stream broke")
+
+    runnable = MagicMock()
+    runnable.stream = stream
+
+    received = []
+    with pytest.raises(RuntimeError, match="stream broke"):
+        async for chunk in client.astream(runnable, []):
+            received.append(chunk)
+
+    assert received == [0, 1, 2]
+    assert loop_thread not in threads
+    runnable.astream.assert_not_called()
+
+
+def test_json_schema_response_format_is_strict():
+    """Test that optional fields are still required and nullable in strict mode."""
+    response_format = json_schema_response_format(LLMExtractionResult)
+
+    assert response_format["json_schema"]["strict"] is True
+    schema = response_format["json_schema"]["schema"]
+    assert schema["additionalProperties"] is False
+    place = schema["properties"]["places"]["items"]
+    assert "timestamp_seconds" in place["required"]
+    assert "default" not in place["properties"]["timestamp_seconds"]
+
+
+def test_create_llm_client_is_shared_per_provider(monkeypatch):
+    """Test that the factory returns one client per provider."""
+    monkeypatch.setattr(llm_client.settings, "openai_api_key", "test-key")
+    create_llm_client.cache_clear()
+
+    assert create_llm_client("openai") is create_llm_client("openai")
+    create_llm_client.cache_clear()
+
+
+@pytest.mark.asyncio
+async def test_create_llm_client_is_rebuilt_after_http_client_closed(monkeypatch):
+    """Test that an app restart doesn't reuse clients bound to the closed HTTP client."""
+    monkeypatch.setattr(llm_client.settings, "openai_api_key", "test-key")
+    create_llm_client.cache_clear()
+    first = create_llm_client("openai")
+
+    await close_http_client()
+
+    second = create_llm_client("openai")
+    assert second is not first
+    assert not get_http_client().is_closed
+    create_llm_client.cache_clear()
+
+
+def test_bind_tools_reuses_binding_for_same_tool_names(client):
+    """Test that tool binding is cached by tool names, regardless of tool instances."""
+    from app.agents.chat_agent import create_get_transcript_tool, create_search_places_tool
+    from app.models.session import Session
+
+    def make_tools():
+        session = Session()
+        return [create_search_places_tool(session), create_get_transcript_tool(session)]
+
+    bound = client.bind_tools(make_tools())
+
+    assert client.bind_tools(make_tools()[::-1]) is bound
+    assert client.bind_tools(make_tools()[:1]) is not bound
+
+
+@pytest.mark.asyncio
+async def test_invoke_structured_builds_structured_model_once_per_schema(client):
+    """Test that the structured-output runnable is reused and uses JSON-schema mode."""
+    structured_llm = MagicMock()
+    structured_llm.ainvoke = AsyncMock(
+        return_value=LLMExtractionResult(places=[], suggested_title="", suggested_summary="")
+    )
+    client._model = MagicMock()
+    client._model.with_structured_output.return_value = structured_llm
+
+    await client.invoke_structured([{"role": "user", "content": "a"}], LLMExtractionResult)
+    await client.invoke_structured([{"role": "user", "content": "b"}], LLMExtractionResult)
+
+    client._model.with_structured_output.assert_called_once_with(
+        LLMExtractionResult, method="json_schema"
+    )
+    assert structured_llm.ainvoke.call_count == 2
@@ -0,0 +1,52 @@
+"""Tests for PII masking."""
+
+from enum import Enum
+
+from app.observability.privacy import pii_masker, string_masker
+
+
+def test_string_masker_redacts_email_and_phone():
+    """Test that emails and phone numbers are masked, keeping identifying hints."""
+    masked = string_masker("Reach me at john.doe@example.com or 555-123-4567 after 6pm")
+
+    assert masked == (
+        "Reach me at [REDACTED EMAIL: j***e@example.com] or [REDACTED PHONE: ***4567] after 6pm"
+    )
+
+
+def test_string_masker_leaves_plain_text_unchanged():
+    """Test that text without PII passes through untouched."""
+    text = "We visited Le Bistro and the Louvre in Paris."
+    assert string_masker(text) == text
+
+
+def test_pii_masker_recurses_into_containers():
+    """Test that nested dicts and lists are masked."""
+    masked = pii_masker({"messages": [{"content": "call 555.123.4567"}], "count": 3})
+
+    assert masked == {"messages": [{"content": "call [REDACTED PHONE: ***4567]"}], "count": 3}
+
+
+def test_pii_masker_handles_deep_nesting():
+    """Test that nesting deeper than the recursion limit is walked, with tuples as lists."""
+    payload: list = []
+    innermost = payload
+    for _ in range(5000):
+        innermost.append([])
+        innermost = innermost[0]
+    innermost.append(("call 555 123 4567",))
+
+    masked = pii_masker(payload)
+
+    for _ in range(5000):
+        masked = masked[0]
+    assert masked == [["call [REDACTED PHONE: ***4567]"]]
+
+
+def test_pii_masker_masks_top_level_str_subclass():
+    """Test that a top-level str enum value is masked like a plain string."""
+
+    class Contact(str, Enum):
+        SUPPORT = "call 555-123-4567"
+
+    assert pii_masker(Contact.SUPPORT) == "call [REDACTED PHONE: ***4567]"
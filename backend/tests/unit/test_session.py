@@ -1,10 +1,15 @@
 """Tests for session management."""
 
+import threading
 
 import pytest
+from langchain_core.messages import AIMessage, HumanMessage
 
+from app.models._defaults import new_id
+from app.models.chat import ChatMessage
 from app.models.place import Place, PlaceType
 from app.models.video import Video
+from app.services import session_manager as session_manager_module
 from app.services.session_manager import SessionManager
 from app.utils.errors import InvalidSessionError
 
@@ -105,3 +110,150 @@ class TestSessionManager:
 
         session_manager.create_session()
         assert session_manager.get_session_count() == 2
+
+    def test_store_and_get_transcript(self, session_manager):
+        """Test storing transcripts outside of session objects."""
+        session = session_manager.create_session()
+        session_manager.store_transcript(session, "test123", "This is a test transcript")
+
+        assert session_manager.get_transcript("test123") == "This is a test transcript"
+        assert session_manager.get_transcript("unknown") is None
+
+    def test_store_transcript_ignores_dropped_session(self, session_manager):
+        """Test that a transcript stored after its session was dropped isn't kept."""
+        session = session_manager.create_session()
+        session_manager.delete_session(session.session_id)
+
+        assert not session_manager.store_transcript(session, "test123", "Late transcript")
+        assert session_manager.get_transcript("test123") is None
+        assert session_manager._session_transcripts == {}
+
+    def test_transcripts_live_as_long_as_a_referencing_session(self, session_manager, monkeypatch):
+        """Test that transcripts are kept for live sessions and released with the last one."""
+        clock = [1000.0]
+        monkeypatch.setattr(session_manager_module.time, "monotonic", lambda: clock[0])
+        first = session_manager.create_session()
+        session_manager.store_transcript(first, "test123", "Shared transcript")
+        clock[0] += 1800
+        second = session_manager.create_session()
+        session_manager.store_transcript(second, "test123", "Shared transcript")
+
+        # Many other videos and plenty of time don't push out a live session's transcript
+        for i in range(2000):
+            session_manager.store_transcript(second, f"other{i}", "Other transcript")
+        session_manager.update_session(second)
+        clock[0] += 1800
+
+        assert session_manager._sweep_expired() == 1  # first expired
+        assert session_manager.get_transcript("test123") == "Shared transcript"
+
+        session_manager.delete_session(second.session_id)
+        assert session_manager.get_transcript("test123") is None
+        assert session_manager.get_transcript("other0") is None
+
+    def test_get_index_is_maintained_incrementally(
+        self, session_manager, sample_place, sample_video
+    ):
+        """Test that the session index is reused, extended on append and rebuilt on shrink."""
+        session = session_manager.create_session()
+        session.places.append(sample_place)
+        session_manager.update_session(session)
+
+        index = session_manager.get_index(session)
+        assert index.places_by_id[sample_place.id] is sample_place
+        assert session_manager.get_index(session) is index
+
+        second_place = sample_place.model_copy(update={"id": "place-2"})
+        session.places.append(second_place)
+        session.videos.append(sample_video)
+        session_manager.update_session(session)
+        index = session_manager.get_index(session)
+        assert index.places_by_id["place-2"] is second_place
+        # A duplicate name within a video keeps resolving to the first place
+        assert index.place_ids_by_key[("Test Restaurant", "test123")] == sample_place.id
+        assert [p for p, _ in index.search_entries_by_type[PlaceType.RESTAURANT]] == [
+            sample_place,
+            second_place,
+        ]
+        assert index.videos_by_id[sample_video.video_id] is sample_video
+
+        session.places.clear()
+        session_manager.update_session(session)
+        assert session_manager.get_index(session).places_by_id == {}
+        assert session_manager.get_index(session).place_ids_by_key == {}
+
+    def test_get_history_messages_converts_new_turns_only(self, session_manager):
+        """Test that converted chat history is cached and extended as turns are added."""
+        session = session_manager.create_session()
+        session.chat_history.append(ChatMessage(role="user", content="Hi"))
+
+        messages = session_manager.get_history_messages(session)
+        assert [type(m) for m in messages] == [HumanMessage]
+
+        first = messages[0]
+        session.chat_history.append(ChatMessage(role="assistant", content="Hello!"))
+        messages = session_manager.get_history_messages(session)
+        assert messages[0] is first
+        assert isinstance(messages[1], AIMessage)
+        assert messages[1].content == "Hello!"
+
+        session.chat_history = []
+        assert session_manager.get_history_messages(session) == []
+
+    def test_sweep_expired_drops_only_due_sessions(self, session_manager, monkeypatch):
+        """Test that cleanup drops expired sessions and honours refreshed expiries."""
+        clock = [1000.0]
+        monkeypatch.setattr(session_manager_module.time, "monotonic", lambda: clock[0])
+        monkeypatch.setattr(session_manager_module.settings, "session_ttl_seconds", 60)
+
+        stale = session_manager.create_session()
+        refreshed = session_manager.create_session()
+
+        clock[0] += 50
+        session_manager.update_session(refreshed)
+        clock[0] += 20
+
+        assert session_manager._sweep_expired() == 1
+        with pytest.raises(InvalidSessionError):
+            session_manager.get_session(stale.session_id)
+        assert session_manager.get_session(refreshed.session_id) is refreshed
+
+        clock[0] += 60
+        with pytest.raises(InvalidSessionError, match="expired"):
+            session_manager.get_session(refreshed.session_id)
+        assert session_manager._sweep_expired() == 0
+
+    def test_concurrent_access_from_threads(self, session_manager, sample_place):
+        """Test that sessions and indexes stay consistent when used from worker threads."""
+        session = session_manager.create_session()
+
+        def worker():
+            for _ in range(200):
+                created = session_manager.create_session()
+                session_manager.update_session(created)
+                session_manager.get_index(session)
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for _ in range(200):
+            session.places.append(sample_place.model_copy(update={"id": new_id()}))
+            session_manager.update_session(session)
+        for thread in threads:
+            thread.join()
+
+        assert session_manager.get_session_count() == 801
+        assert len(session_manager.get_index(session).places_by_id) == 200
+
+    def test_get_history_messages_respects_token_budget(self, session_manager, monkeypatch):
+        """Test that only the newest messages fitting the token budget are returned."""
+        monkeypatch.setattr(session_manager_module, "count_tokens", len)
+        session = session_manager.create_session()
+        for content in ["a" * 50, "b" * 30, "c" * 20]:
+            session.chat_history.append(ChatMessage(role="user", content=content))
+
+        window = session_manager.get_history_messages(session, max_tokens=60)
+
+        assert [m.content[0] for m in window] == ["b", "c"]
+        assert len(session_manager.get_history_messages(session, max_tokens=10)) == 0
+        assert len(session_manager.get_history_messages(session)) == 3
@@ -1,8 +1,18 @@
 """Tests for YouTube service."""
 
+import threading
+from unittest.mock import AsyncMock
+
 import pytest
 
-from app.services.youtube import extract_video_id
+from app.services import youtube
+from app.services.youtube import (
+    canonicalize_video_url,
+    extract_video_id,
+    process_video,
+    process_videos,
+)
+from app.utils.errors import YouTubeTranscriptError
 
 
 class TestExtractVideoId:
@@ -28,6 +38,11 @@ class TestExtractVideoId:
         url = "https://www.youtube.com/embed/dQw4w9WgXcQ"
         assert extract_video_id(url) == "dQw4w9WgXcQ"
 
+    def test_extract_from_legacy_v_url(self):
+        """Test extracting from the legacy /v/ URL form."""
+        url = "https://www.youtube.com/v/dQw4w9WgXcQ?version=3"
+        assert extract_video_id(url) == "dQw4w9WgXcQ"
+
     def test_extract_with_additional_params(self):
         """Test extracting when URL has additional parameters."""
         url = "https://www.youtube.com/watch?v=dQw4w9WgXcQ&t=10s"
@@ -38,7 +53,112 @@ class TestExtractVideoId:
         with pytest.raises(ValueError):
             extract_video_id("https://not-youtube.com/somepage")
 
+    def test_extract_from_query_parameter_fallback(self):
+        """Test that a v parameter in a non-standard position is still found."""
+        url = "https://www.youtube.com/watch?feature=share&v=dQw4w9WgXcQ"
+        assert extract_video_id(url) == "dQw4w9WgXcQ"
+
+    def test_malformed_url_raises_value_error(self):
+        """Test that URLs urlparse rejects surface as ValueError."""
+        with pytest.raises(ValueError):
+            extract_video_id("https://[youtube.com/watch")
+
+    def test_wrong_length_video_id_raises_error(self):
+        """Test that IDs that aren't 11 characters long are rejected."""
+        with pytest.raises(ValueError):
+            extract_video_id("https://www.youtube.com/watch?v=abc")
+
     def test_missing_video_id_raises_error(self):
         """Test that URLs without video ID raise ValueError."""
         with pytest.raises(ValueError):
             extract_video_id("https://www.youtube.com/")
+
+
+class TestCanonicalizeVideoUrl:
+    """Tests for YouTube URL validation and normalization."""
+
+    @pytest.mark.parametrize(
+        "url",
+        [
+            "https://www.youtube.com/watch?v=dQw4w9WgXcQ",
+            "  https://youtu.be/dQw4w9WgXcQ?si=EcqzJFv5hf--fWDD ",
+            "https://m.youtube.com/watch?feature=share&v=dQw4w9WgXcQ&t=10s",
+            "https://www.youtube.com/shorts/dQw4w9WgXcQ",
+            "youtube.com/embed/dQw4w9WgXcQ",
+        ],
+    )
+    def test_normalizes_to_watch_url(self, url):
+        """Test that supported URL shapes normalize to the canonical watch URL."""
+        assert canonicalize_video_url(url) == "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+
+    @pytest.mark.parametrize(
+        "url",
+        [
+            "",
+            "https://not-youtube.com/watch?v=dQw4w9WgXcQ",
+            "https://www.youtube.com/",
+            "https://www.youtube.com/watch?v=short",
+        ],
+    )
+    def test_invalid_url_raises_error(self, url):
+        """Test that malformed URLs are rejected."""
+        with pytest.raises(ValueError):
+            canonicalize_video_url(url)
+
+
+class TestProcessVideo:
+    """Tests for process_video caching."""
+
+    @pytest.mark.asyncio
+    async def test_caches_by_video_id(self, monkeypatch):
+        """Test that any URL form of a processed video skips the transcript fetch."""
+        youtube._videos.clear()
+        fetch = AsyncMock(return_value="Transcript text")
+        monkeypatch.setattr(youtube, "fetch_transcript", fetch)
+
+        first = await process_video("https://www.youtube.com/watch?v=dQw4w9WgXcQ")
+        first.title = "Edited by a session"
+        second = await process_video("https://youtu.be/dQw4w9WgXcQ")
+
+        fetch.assert_awaited_once()
+        assert second.transcript == "Transcript text"
+        # Each caller gets its own copy
+        assert second.title == "Video dQw4w9WgXcQ"
+        youtube._videos.clear()
+
+    @pytest.mark.asyncio
+    async def test_process_videos_returns_errors_in_place(self, monkeypatch):
+        """Test that one failing URL doesn't prevent results for the others."""
+        youtube._videos.clear()
+
+        async def fetch(video_id):
+            if video_id == "brokenVideo":
+                raise YouTubeTranscriptError("Transcript not available")
+            return f"Transcript for {video_id}"
+
+        monkeypatch.setattr(youtube, "fetch_transcript", fetch)
+
+        ok, failed, invalid = await process_videos(
+            [
+                "https://youtu.be/dQw4w9WgXcQ",
+                "https://youtu.be/brokenVideo",
+                "https://example.com",
+            ]
+        )
+
+        assert ok.transcript == "Transcript for dQw4w9WgXcQ"
+        assert isinstance(failed, YouTubeTranscriptError)
+        assert isinstance(invalid, ValueError)
+        youtube._videos.clear()
+
+
+def test_transcript_api_is_reused_per_thread():
+    """Test that each thread keeps one transcript client across fetches."""
+    api = youtube._transcript_api()
+    others = []
+    thread = threading.Thread(target=lambda: others.append(youtube._transcript_api()))
+    thread.start()
+    thread.join()
+
+    assert youtube._transcript_api() is api
+    assert others[0] is not api
@@ -27,7 +27,7 @@ export interface Video {
   title: string;
   description: string | null;
   duration_seconds: number;
-  transcript: string;
+  transcript?: string; // Omitted from ingest responses; empty in sessions
   summary: string;
   url: string;
   places_count: number;